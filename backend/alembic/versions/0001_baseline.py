@@ -0,0 +1,263 @@
+"""Baseline: the schema as the app's create_all() built it when migrations were added
+
+That includes the tables of the features that came just before them
+(generation_jobs, generation_results, question_signatures and
+question_lsh_bands); a database from an older release gets whichever of
+these it is missing.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17 06:00:45.714595
+
+"""
+
+from typing import Sequence, Set, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_tables() -> Set[str]:
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    # A database the app already built with create_all() keeps its tables:
+    # only the missing ones are created, so upgrade works on it unstamped
+    existing = _existing_tables()
+    if "generation_results" not in existing:
+        op.create_table(
+            "generation_results",
+            sa.Column("key", sa.String(length=64), nullable=False),
+            sa.Column("questions", sa.JSON(), nullable=False),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+                nullable=True,
+            ),
+            sa.PrimaryKeyConstraint("key"),
+        )
+        with op.batch_alter_table("generation_results", schema=None) as batch_op:
+            batch_op.create_index(
+                batch_op.f("ix_generation_results_created_at"),
+                ["created_at"],
+                unique=False,
+            )
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("username", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+                nullable=True,
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        with op.batch_alter_table("users", schema=None) as batch_op:
+            batch_op.create_index(batch_op.f("ix_users_email"), ["email"], unique=True)
+            batch_op.create_index(batch_op.f("ix_users_id"), ["id"], unique=False)
+            batch_op.create_index(
+                batch_op.f("ix_users_username"), ["username"], unique=True
+            )
+
+    if "quizzes" not in existing:
+        op.create_table(
+            "quizzes",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("score", sa.Float(), nullable=True),
+            sa.Column("total_questions", sa.Integer(), nullable=True),
+            sa.Column("results_data", sa.Text(), nullable=True),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+                nullable=True,
+            ),
+            sa.ForeignKeyConstraint(
+                ["user_id"],
+                ["users.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        with op.batch_alter_table("quizzes", schema=None) as batch_op:
+            batch_op.create_index(batch_op.f("ix_quizzes_id"), ["id"], unique=False)
+
+    if "generation_jobs" not in existing:
+        op.create_table(
+            "generation_jobs",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.String(), nullable=True),
+            sa.Column("source_type", sa.String(), nullable=False),
+            sa.Column("source_path", sa.String(), nullable=True),
+            sa.Column("text_content", sa.Text(), nullable=True),
+            sa.Column("config", sa.JSON(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("progress", sa.Float(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("max_attempts", sa.Integer(), nullable=False),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("quiz_id", sa.Integer(), nullable=True),
+            sa.Column("locked_by", sa.String(), nullable=True),
+            sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+            sa.Column(
+                "available_at",
+                sa.DateTime(),
+                server_default=sa.func.now(),
+                nullable=True,
+            ),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+                nullable=True,
+            ),
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+                nullable=True,
+            ),
+            sa.ForeignKeyConstraint(
+                ["quiz_id"],
+                ["quizzes.id"],
+            ),
+            sa.ForeignKeyConstraint(
+                ["user_id"],
+                ["users.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        with op.batch_alter_table("generation_jobs", schema=None) as batch_op:
+            batch_op.create_index(
+                batch_op.f("ix_generation_jobs_id"), ["id"], unique=False
+            )
+            batch_op.create_index(
+                batch_op.f("ix_generation_jobs_status"), ["status"], unique=False
+            )
+            batch_op.create_index(
+                batch_op.f("ix_generation_jobs_user_id"), ["user_id"], unique=False
+            )
+
+    if "questions" not in existing:
+        op.create_table(
+            "questions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("quiz_id", sa.Integer(), nullable=False),
+            sa.Column("question_text", sa.Text(), nullable=False),
+            sa.Column("question_type", sa.String(), nullable=False),
+            sa.Column("options", sa.JSON(), nullable=True),
+            sa.Column("correct_answer", sa.Text(), nullable=False),
+            sa.Column("bloom_level", sa.String(), nullable=False),
+            sa.Column("source_page", sa.Integer(), nullable=True),
+            sa.Column("source_context_snippet", sa.Text(), nullable=True),
+            sa.Column("difficulty_level", sa.String(), nullable=True),
+            sa.ForeignKeyConstraint(
+                ["quiz_id"],
+                ["quizzes.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        with op.batch_alter_table("questions", schema=None) as batch_op:
+            batch_op.create_index(batch_op.f("ix_questions_id"), ["id"], unique=False)
+
+    if "question_lsh_bands" not in existing:
+        op.create_table(
+            "question_lsh_bands",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("band_hash", sa.BigInteger(), nullable=False),
+            sa.Column("question_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["question_id"], ["questions.id"], ondelete="CASCADE"
+            ),
+            sa.ForeignKeyConstraint(
+                ["user_id"],
+                ["users.id"],
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        with op.batch_alter_table("question_lsh_bands", schema=None) as batch_op:
+            batch_op.create_index(
+                "ix_question_lsh_bands_question", ["question_id"], unique=False
+            )
+            batch_op.create_index(
+                "ix_question_lsh_bands_user_band",
+                ["user_id", "band_hash"],
+                unique=False,
+            )
+
+    if "question_signatures" not in existing:
+        op.create_table(
+            "question_signatures",
+            sa.Column("question_id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("signature", sa.LargeBinary(), nullable=False),
+            sa.ForeignKeyConstraint(
+                ["question_id"], ["questions.id"], ondelete="CASCADE"
+            ),
+            sa.ForeignKeyConstraint(
+                ["user_id"],
+                ["users.id"],
+            ),
+            sa.PrimaryKeyConstraint("question_id"),
+        )
+        with op.batch_alter_table("question_signatures", schema=None) as batch_op:
+            batch_op.create_index(
+                batch_op.f("ix_question_signatures_user_id"), ["user_id"], unique=False
+            )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("question_signatures", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_question_signatures_user_id"))
+
+    op.drop_table("question_signatures")
+    with op.batch_alter_table("question_lsh_bands", schema=None) as batch_op:
+        batch_op.drop_index("ix_question_lsh_bands_user_band")
+        batch_op.drop_index("ix_question_lsh_bands_question")
+
+    op.drop_table("question_lsh_bands")
+    with op.batch_alter_table("questions", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_questions_id"))
+
+    op.drop_table("questions")
+    with op.batch_alter_table("generation_jobs", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_generation_jobs_user_id"))
+        batch_op.drop_index(batch_op.f("ix_generation_jobs_status"))
+        batch_op.drop_index(batch_op.f("ix_generation_jobs_id"))
+
+    op.drop_table("generation_jobs")
+    with op.batch_alter_table("quizzes", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_quizzes_id"))
+
+    op.drop_table("quizzes")
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_users_username"))
+        batch_op.drop_index(batch_op.f("ix_users_id"))
+        batch_op.drop_index(batch_op.f("ix_users_email"))
+
+    op.drop_table("users")
+    with op.batch_alter_table("generation_results", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_generation_results_created_at"))
+
+    op.drop_table("generation_results")
@@ -0,0 +1,49 @@
+"""Indexes for the keyset-paginated quiz listing and per-quiz question loads
+
+Revision ID: 0002_listing_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-17 06:00:58.820617
+
+"""
+
+from typing import Sequence, Set, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_listing_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_indexes(table: str) -> Set[str]:
+    if context.is_offline_mode():
+        return set()
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    # create_all() already made both on databases created after this revision
+    if "ix_questions_quiz_id" not in _existing_indexes("questions"):
+        with op.batch_alter_table("questions", schema=None) as batch_op:
+            batch_op.create_index(
+                batch_op.f("ix_questions_quiz_id"), ["quiz_id"], unique=False
+            )
+
+    if "ix_quizzes_user_id_created_at" not in _existing_indexes("quizzes"):
+        with op.batch_alter_table("quizzes", schema=None) as batch_op:
+            batch_op.create_index(
+                "ix_quizzes_user_id_created_at",
+                ["user_id", "created_at"],
+                unique=False,
+            )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("quizzes", schema=None) as batch_op:
+        batch_op.drop_index("ix_quizzes_user_id_created_at")
+
+    with op.batch_alter_table("questions", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_questions_quiz_id"))
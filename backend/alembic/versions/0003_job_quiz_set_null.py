@@ -0,0 +1,51 @@
+"""Keep a generation job when its quiz is deleted: quiz_id ON DELETE SET NULL
+
+Revision ID: 0003_job_quiz_set_null
+Revises: 0002_listing_indexes
+Create Date: 2026-10-17 07:05:12.418203
+
+"""
+
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_job_quiz_set_null"
+down_revision: Union[str, None] = "0002_listing_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FK_NAME = "fk_generation_jobs_quiz_id_quizzes"
+# The baseline's foreign key is unnamed; on SQLite batch mode names it by this
+NAMING_CONVENTION = {
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"
+}
+
+
+def _quiz_fk_name() -> Optional[str]:
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys("generation_jobs"):
+        if fk["constrained_columns"] == ["quiz_id"]:
+            return fk["name"] or FK_NAME
+    return None
+
+
+def _replace_quiz_fk(ondelete: Optional[str]) -> None:
+    existing = _quiz_fk_name()
+    with op.batch_alter_table(
+        "generation_jobs", schema=None, naming_convention=NAMING_CONVENTION
+    ) as batch_op:
+        if existing:
+            batch_op.drop_constraint(existing, type_="foreignkey")
+        batch_op.create_foreign_key(
+            FK_NAME, "quizzes", ["quiz_id"], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    _replace_quiz_fk("SET NULL")
+
+
+def downgrade() -> None:
+    _replace_quiz_fk(None)
@@ -0,0 +1,35 @@
+"""
+Index existing questions for near-duplicate detection.
+
+    python -m app.backfill_signatures
+
+Questions stored before question_signatures / question_lsh_bands existed
+have no fingerprint, so avoid_bank_duplicates cannot see them. Run this
+once after upgrading; it only touches questions without a signature, in
+committed batches, so it can be interrupted and re-run.
+"""
+
+import argparse
+
+from .core.database import Base, SessionLocal, engine
+from .services.dedup import backfill_signatures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fingerprint stored questions for near-duplicate detection"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Questions per transaction"
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as db:
+        indexed = backfill_signatures(db, batch_size=max(1, args.batch_size))
+    print(f"Indexed {indexed} questions")
+
+
+if __name__ == "__main__":
+    main()
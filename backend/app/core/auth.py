@@ -1,7 +1,8 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from .database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_async_db
 from .security import verify_token
 from ..models.user import User
 
@@ -10,7 +11,7 @@ security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -23,7 +24,7 @@ async def get_current_user(
     if username is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if user is None:
         raise credentials_exception
 
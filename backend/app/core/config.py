@@ -13,9 +13,80 @@ class Settings(BaseSettings):
         default="sqlite:///./questai.db",
         env="DATABASE_URL",
     )
+    # PostgreSQL connection pool, per engine (an API process has a sync and an
+    # async one): kept-open connections, extra ones allowed under load, seconds
+    # to wait for a free connection, max connection age, and a liveness check
+    # on checkout so connections dropped by the server are replaced
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    # SQLite, applied on every new connection: WAL lets readers run alongside
+    # the writer, a writer waits up to sqlite_busy_timeout_ms for the lock
+    # instead of failing with "database is locked", and reads are memory-mapped
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size_mb: int = 256
     frontend_origins: Optional[str] = (
         None  # Comma-separated list of allowed frontend URLs
     )
+    # spaCy nlp.pipe() tuning for whole-document analysis
+    nlp_batch_size: int = 64
+    nlp_n_process: int = 1
+    # Load the spaCy models in the background at startup (GET /ready turns 200
+    # once done); when off they load on the first generation request
+    nlp_warmup_on_startup: bool = True
+    # Chunks longer than this many tokens (dense pages, pasted text without
+    # blank lines) are parsed as sentence windows of at most this size, one
+    # Doc at a time
+    nlp_window_max_tokens: int = 2000
+    # Stop reading a document once its generation has grown the process by
+    # this many MB and build the quiz from what was analyzed (None = no limit)
+    generation_memory_ceiling_mb: Optional[int] = 1024
+    # Content-addressed cache of parsed paragraphs (set the dir empty to keep it in memory only)
+    parse_cache_max_entries: int = 2048
+    parse_cache_dir: Optional[str] = "./cache/parses"
+    parse_cache_max_disk_mb: int = 512
+    # Uploads larger than this are rejected; up to upload_in_memory_max_mb they
+    # are parsed straight from memory, bigger ones are copied to a temp file
+    max_file_size_mb: int = 10
+    upload_in_memory_max_mb: int = 2
+    # Server-side caps on how much of an uploaded PDF is read (None = no cap)
+    pdf_max_pages: Optional[int] = None
+    pdf_max_chars: Optional[int] = None
+    # Parallel PDF extraction: worker processes (capped at the core count),
+    # minimum page count before the pool is used, and pages per worker task
+    pdf_extract_workers: int = 4
+    pdf_parallel_min_pages: int = 64
+    pdf_parallel_chunk_pages: int = 16
+    # Candidate sentences kept (reservoir-sampled) per category per document
+    generation_sample_pool_size: int = 256
+    # Quiz generation worker pool: "thread" or "process" executor, number of
+    # slots (each with its own NLPService) and how many requests may wait
+    generation_executor: str = "thread"
+    generation_workers: int = 2
+    generation_max_queue: int = 8
+    # Background generation jobs (POST /quiz/jobs): where uploads wait for a
+    # worker, lease length before a silent worker's job is reclaimed, retries,
+    # idle poll interval, and worker threads to run inside the API process
+    # (0 = run `python -m app.worker` separately)
+    job_upload_dir: str = "./uploads/jobs"
+    job_lease_seconds: int = 120
+    job_max_attempts: int = 3
+    job_poll_interval_seconds: float = 2.0
+    job_workers_in_process: int = 0
+    # Seeded generations are memoized in the database for this many days
+    generation_result_ttl_days: int = 30
+    # Question/answer backend: "rules" (patterns, no model) or "seq2seq" (a
+    # local Hugging Face model dir, see requirements-ml.txt). Seq2seq prompts
+    # from concurrent requests are micro-batched: up to qg_max_batch_size per
+    # forward pass, waiting at most qg_max_wait_ms to fill a batch
+    qg_backend: str = "rules"
+    qg_model_path: Optional[str] = None
+    qg_quantize: bool = True
+    qg_max_batch_size: int = 16
+    qg_max_wait_ms: float = 10
+    qg_max_new_tokens: int = 48
 
     class Config:
         env_file = ".env"
@@ -1,13 +1,89 @@
-from sqlalchemy import create_engine
+from typing import Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import settings
+from .metrics import observe_commits, observe_pool
+
+# Async drivers for the request path, by the sync driver's backend
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str):
+    """DATABASE_URL with its driver swapped for the backend's async driver"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict:
+    """create_engine() keyword arguments for the database backend of url"""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        # Sessions may be used from threads other than the one that connected
+        options = {"connect_args": {"check_same_thread": False}}
+        if is_async and url.database not in (None, "", ":memory:"):
+            # aiosqlite defaults to NullPool for files: a new connection
+            # (and thread) per request, with the pragmas run every time
+            options["poolclass"] = AsyncAdaptedQueuePool
+        return options
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # Safe with WAL: a power loss can drop the last commits, never corrupt
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}")
+    finally:
+        cursor.close()
 
-engine = create_engine(
-    settings.database_url, connect_args={"check_same_thread": False}  # Only for SQLite
-)
+
+def configure_engine(sync_engine, name: str):
+    """Per-connection setup and pool metrics for an engine (the sync side of an async one)"""
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    observe_pool(sync_engine, name)
+
+
+# Sync engine: job workers, the bank duplicate filter, create_all and alembic
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+configure_engine(engine, "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+observe_commits(SessionLocal)
+
+# Async engine: every API route, so queries never block the event loop
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    **engine_options(settings.database_url, is_async=True),
+)
+configure_engine(async_engine.sync_engine, "async")
+
+# Attributes stay loaded after commit: an expired one can't be lazy-loaded
+# from async code, e.g. while FastAPI serializes the response
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    # SessionLocal's class, so observe_commits also times async commits
+    sync_session_class=SessionLocal.class_,
+)
 
 Base = declarative_base()
 
@@ -19,3 +95,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session (used by all routes)"""
+    async with AsyncSessionLocal() as db:
+        yield db
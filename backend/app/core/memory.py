@@ -0,0 +1,85 @@
+import os
+from typing import Dict, Optional
+
+# smaps_rollup fields we report, in bytes
+_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def process_memory(pid: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """
+    Memory breakdown of a process from /proc/<pid>/smaps_rollup (Linux 4.14+).
+
+    uss (private clean + dirty) is what the process alone costs: with models
+    preloaded in a pre-fork master it should stay well below rss, because the
+    model pages are shared copy-on-write. Returns None where unavailable.
+    """
+    path = f"/proc/{pid or os.getpid()}/smaps_rollup"
+    try:
+        with open(path) as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    usage = {}
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name in _FIELDS:
+            usage[_FIELDS[name]] = int(rest.split()[0]) * 1024
+    usage["uss"] = usage.get("private_clean", 0) + usage.get("private_dirty", 0)
+    return usage
+
+
+def format_memory(usage: Optional[Dict[str, int]]) -> str:
+    if usage is None:
+        return "memory usage unavailable"
+    mib = 1024 * 1024
+    return (
+        f"uss={usage['uss'] / mib:.1f}MiB pss={usage.get('pss', 0) / mib:.1f}MiB "
+        f"rss={usage.get('rss', 0) / mib:.1f}MiB"
+    )
+
+
+def current_rss() -> Optional[int]:
+    """This process's resident set size in bytes (cheap: one line of /proc)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class MemoryCeiling:
+    """
+    Growth of this process's rss since creation, checked against limit_mb.
+
+    Used per request: a generation stops reading more input once it has
+    grown the process by more than its budget. Concurrent requests in the
+    same process count towards each other's growth, so treat the limit as
+    a ceiling on the process, not an exact per-request measurement. Never
+    trips when limit_mb is None or rss is unavailable (non-Linux). Once
+    tripped it stays tripped, and reached records that it did.
+    """
+
+    def __init__(self, limit_mb: Optional[int]):
+        self.limit = limit_mb * 1024 * 1024 if limit_mb else None
+        self.baseline = current_rss() if self.limit else None
+        self.reached = False
+
+    def growth(self) -> int:
+        rss = current_rss()
+        if rss is None or self.baseline is None:
+            return 0
+        return rss - self.baseline
+
+    def exceeded(self) -> bool:
+        if self.limit is not None and self.growth() > self.limit:
+            self.reached = True
+        return self.reached
@@ -0,0 +1,213 @@
+"""
+Prometheus metrics for the generation and export pipeline, served at /metrics.
+
+- questai_stage_duration_seconds{stage}: pdf_extraction, spacy_parse,
+  db_commit, docx_export
+- questai_question_generation_seconds{question_type}: one generator call
+- questai_questions_generated_total / questai_questions_failed_total
+  {question_type}: generator calls that did / did not produce a question
+- questai_generations_in_flight: documents being turned into quizzes
+- questai_db_pool_connections / questai_db_pool_checked_out{engine}:
+  connections a pool holds open / has lent out (sync or async engine)
+
+The decorators below wrap the existing NLPService / ExportService methods;
+each observation is a few microseconds, cheap next to the work it times.
+
+With several processes (gunicorn workers, GENERATION_EXECUTOR=process) set
+PROMETHEUS_MULTIPROC_DIR to an empty directory before start-up so every
+process writes its samples there and /metrics reports their sum.
+"""
+
+import functools
+import inspect
+import os
+import time
+from typing import Callable, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+# Parsing one paragraph takes milliseconds, a whole PDF can take minutes
+_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+STAGE_SECONDS = Histogram(
+    "questai_stage_duration_seconds",
+    "Time spent per pipeline stage",
+    ["stage"],
+    buckets=_BUCKETS,
+)
+QUESTION_SECONDS = Histogram(
+    "questai_question_generation_seconds",
+    "Time for one question generator call",
+    ["question_type"],
+    buckets=_BUCKETS,
+)
+QUESTIONS_GENERATED = Counter(
+    "questai_questions_generated_total",
+    "Generator calls that produced a question",
+    ["question_type"],
+)
+QUESTIONS_FAILED = Counter(
+    "questai_questions_failed_total",
+    "Generator calls that produced no question or raised",
+    ["question_type"],
+)
+GENERATIONS_IN_FLIGHT = Gauge(
+    "questai_generations_in_flight",
+    "Quiz generations currently running",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "questai_db_pool_connections",
+    "Database connections open in the engine's pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "questai_db_pool_checked_out",
+    "Database connections currently lent out by the engine's pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+
+def observe_stage(stage: str) -> Callable:
+    """
+    Time calls of the decorated function under STAGE_SECONDS{stage}.
+
+    For a generator function the time spent producing items is summed over
+    the whole iteration (not the time the consumer spends between items).
+    """
+    histogram = STAGE_SECONDS.labels(stage)
+
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                iterator = func(*args, **kwargs)
+                elapsed = 0.0
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                        finally:
+                            elapsed += time.perf_counter() - start
+                        yield item
+                finally:
+                    iterator.close()
+                    histogram.observe(elapsed)
+
+            return wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def observe_question_generation(question_type: str) -> Callable:
+    """Time a question generator and count whether it returned a question"""
+    histogram = QUESTION_SECONDS.labels(question_type)
+    generated = QUESTIONS_GENERATED.labels(question_type)
+    failed = QUESTIONS_FAILED.labels(question_type)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                failed.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start)
+            (generated if result else failed).inc()
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def track_in_flight(func: Callable) -> Callable:
+    """Count calls of func in progress in GENERATIONS_IN_FLIGHT"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with GENERATIONS_IN_FLIGHT.track_inprogress():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def observe_commits(session_factory):
+    """Time every successful Session.commit() of sessions from session_factory"""
+    histogram = STAGE_SECONDS.labels("db_commit")
+
+    @event.listens_for(session_factory, "before_commit")
+    def _start(session):
+        session.info["commit_started"] = time.perf_counter()
+
+    @event.listens_for(session_factory, "after_commit")
+    def _finish(session):
+        started = session.info.pop("commit_started", None)
+        if started is not None:
+            histogram.observe(time.perf_counter() - started)
+
+
+def observe_pool(engine, name: str):
+    """
+    Track engine's pool in DB_POOL_CONNECTIONS / DB_POOL_CHECKED_OUT{name}.
+
+    Kept up to date from pool events rather than read at scrape time, so the
+    gauges also add up across processes.
+    """
+    connections = DB_POOL_CONNECTIONS.labels(name)
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        connections.inc()
+
+    @event.listens_for(engine, "close")
+    def _close(dbapi_connection, connection_record):
+        connections.dec()
+
+    @event.listens_for(engine, "close_detached")
+    def _close_detached(dbapi_connection):
+        connections.dec()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """(body, content type) for the /metrics endpoint"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,12 +1,22 @@
-from fastapi import FastAPI
+import logging
+import threading
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 
 from .core.config import settings
+from sqlalchemy import text
+
 from .core.database import Base, engine
+from .core.metrics import render_metrics
 from .routers import auth, quiz
+from .services.job_queue import start_in_process_workers
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# The app's module loggers report at INFO; uvicorn only configures its own
+logging.basicConfig(
+    level=logging.INFO, format="%(levelname)s:     %(name)s: %(message)s"
+)
 
 app = FastAPI(
     title="QuEstAI API",
@@ -14,20 +24,74 @@ app = FastAPI(
     version="1.0.0",
 )
 
-# Configure CORS
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse bodies whose declared size is over the limit before they are buffered"""
+    content_length = request.headers.get("content-length")
+    # Allow some slack for the multipart envelope and the other form fields
+    max_body = (settings.max_file_size_mb + 1) * 1024 * 1024
+    if content_length and content_length.isdigit() and int(content_length) > max_body:
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={
+                "detail": f"Upload exceeds the {settings.max_file_size_mb} MB limit"
+            },
+        )
+    return await call_next(request)
+
+
+# Configure CORS (added last so it also wraps the 413 responses above)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor of GET /quiz/
+    expose_headers=["X-Next-Cursor"],
 )
 
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(quiz.router)
 
 
+_stop_job_workers = None
+
+
+@app.on_event("startup")
+def create_tables():
+    # Done at startup rather than import so importing the app never touches the DB
+    Base.metadata.create_all(bind=engine)
+
+
+@app.on_event("startup")
+def warm_up_generation():
+    """Load the NLP models in the background; /ready reports when they are loaded"""
+    if settings.nlp_warmup_on_startup:
+        threading.Thread(
+            target=quiz.generation_pool.warm_up, name="nlp-warm-up", daemon=True
+        ).start()
+
+
+@app.on_event("startup")
+def start_job_workers():
+    global _stop_job_workers
+    if settings.job_workers_in_process > 0:
+        _stop_job_workers = start_in_process_workers(
+            settings.job_workers_in_process, quiz.job_queue
+        )
+
+
+@app.on_event("shutdown")
+def shutdown_generation_pool():
+    quiz.generation_pool.shutdown()
+    if _stop_job_workers is not None:
+        _stop_job_workers()
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to QuEstAI API"}
@@ -36,3 +100,37 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (see core/metrics.py)"""
+    body, content_type = render_metrics()
+    # Passed as a header: media_type would get a second "charset" appended
+    return Response(content=body, headers={"Content-Type": content_type})
+
+
+@app.get("/ready")
+def readiness_check():
+    """Ready to serve generation: models warmed up (if enabled) and DB reachable"""
+    pool = quiz.generation_pool
+    checks = {
+        "models": pool.warmed_up or not settings.nlp_warmup_on_startup,
+        "database": True,
+    }
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception:
+        checks["database"] = False
+
+    if all(checks.values()):
+        return {"status": "ready", "checks": checks}
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "failed" if pool.warm_up_error else "starting",
+            "checks": checks,
+            "error": pool.warm_up_error,
+        },
+    )
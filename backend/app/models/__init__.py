@@ -2,5 +2,16 @@
 from .user import User
 from .quiz import Quiz
 from .question import Question
+from .generation_job import GenerationJob
+from .question_signature import QuestionSignature, QuestionLSHBand
+from .generation_result import GenerationResult
 
-__all__ = ["User", "Quiz", "Question"]
+__all__ = [
+    "User",
+    "Quiz",
+    "Question",
+    "GenerationJob",
+    "QuestionSignature",
+    "QuestionLSHBand",
+    "GenerationResult",
+]
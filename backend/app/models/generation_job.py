@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, JSON
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    title = Column(String, nullable=False)
+    description = Column(String)
+    source_type = Column(String, nullable=False)  # pdf, text
+    source_path = Column(String)  # Stored upload for PDF jobs
+    text_content = Column(Text)  # Pasted text for text jobs
+    config = Column(JSON, nullable=False)  # QuestionGenConfig as a dict
+
+    # queued -> running -> succeeded / failed (running goes back to queued on retry)
+    status = Column(String, nullable=False, default="queued", index=True)
+    progress = Column(Float, nullable=False, default=0.0)  # 0.0 - 1.0
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    error = Column(Text)
+    # Deleting the quiz keeps the job record, just without its quiz
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="SET NULL"))
+
+    # Lease held by the worker running the job; a stale heartbeat means it crashed
+    locked_by = Column(String)
+    heartbeat_at = Column(DateTime)
+    available_at = Column(DateTime, server_default=func.now())  # Retry backoff
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class GenerationResult(Base):
+    """Memoized output of a seeded generation (see services/result_cache.py)"""
+
+    __tablename__ = "generation_results"
+
+    # sha256 of (content digest, config incl. seed, generator version)
+    key = Column(String(64), primary_key=True)
+    questions = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
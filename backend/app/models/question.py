@@ -7,7 +7,7 @@ class Question(Base):
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False, index=True)
     question_text = Column(Text, nullable=False)
     question_type = Column(String, nullable=False)  # MCQ, Short Answer, True/False
     options = Column(JSON)  # For MCQ options, null for others
@@ -23,3 +23,8 @@ class Question(Base):
 
     # Relationships
     quiz = relationship("Quiz", back_populates="questions")
+    # Near-duplicate index rows, removed along with the question
+    signature = relationship(
+        "QuestionSignature", uselist=False, cascade="all, delete-orphan"
+    )
+    lsh_bands = relationship("QuestionLSHBand", cascade="all, delete-orphan")
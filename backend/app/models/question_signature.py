@@ -0,0 +1,39 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+)
+from ..core.database import Base
+
+
+class QuestionSignature(Base):
+    """MinHash signature of a stored question's text (see services/dedup.py)"""
+
+    __tablename__ = "question_signatures"
+
+    question_id = Column(
+        Integer, ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    signature = Column(LargeBinary, nullable=False)  # uint64 array, little-endian
+
+
+class QuestionLSHBand(Base):
+    """One LSH band hash of a question signature; looked up by (user_id, band_hash)"""
+
+    __tablename__ = "question_lsh_bands"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    band_hash = Column(BigInteger, nullable=False)
+    question_id = Column(
+        Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False
+    )
+
+    __table_args__ = (
+        Index("ix_question_lsh_bands_user_band", "user_id", "band_hash"),
+        Index("ix_question_lsh_bands_question", "question_id"),
+    )
@@ -1,8 +1,27 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Float,
+    Text,
+    Index,
+)
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
 
+# SQLite's CURRENT_TIMESTAMP (the server default) has no fractional seconds;
+# binding datetimes in the same format keeps keyset comparisons on created_at
+# exact (SQLite compares them as strings)
+_SQLITE_TIMESTAMP = sqlite.DATETIME(
+    storage_format=(
+        "%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    )
+)
+
 
 class Quiz(Base):
     __tablename__ = "quizzes"
@@ -12,13 +31,20 @@ class Quiz(Base):
     description = Column(String)
     score = Column(Float, default=0.0)
     total_questions = Column(Integer, default=0)
-    # Stores the most recent detailed results (per-question) as JSON text
-    results_data = Column(Text, nullable=True)
+    # Stores the most recent detailed results (per-question) as JSON text;
+    # only loaded when accessed (or undefer()ed), listings never need it
+    results_data = deferred(Column(Text, nullable=True))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(
+        DateTime(timezone=True).with_variant(_SQLITE_TIMESTAMP, "sqlite"),
+        server_default=func.now(),
+    )
 
     # Relationships
     owner = relationship("User", back_populates="quizzes")
     questions = relationship(
         "Question", back_populates="quiz", cascade="all, delete-orphan"
     )
+
+    # Keyset pagination of a user's quizzes, newest first (GET /quiz/)
+    __table_args__ = (Index("ix_quizzes_user_id_created_at", "user_id", "created_at"),)
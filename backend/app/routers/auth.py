@@ -1,9 +1,10 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.security import verify_password, get_password_hash, create_access_token
 from ..core.config import settings
 from ..models.user import User
@@ -13,13 +14,13 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
 @router.post("/register", response_model=UserSchema)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Check if user already exists
-    db_user = (
-        db.query(User)
-        .filter((User.email == user.email) | (User.username == user.username))
-        .first()
+    db_user = await db.scalar(
+        select(User).where(
+            (User.email == user.email) | (User.username == user.username)
+        )
     )
 
     if db_user:
@@ -35,18 +36,19 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     return db_user
 
 
 @router.post("/login", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Login user and return access token"""
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await db.scalar(select(User).where(User.username == form_data.username))
 
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
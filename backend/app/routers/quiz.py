@@ -1,77 +1,207 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    UploadFile,
+    File,
+    Form,
+    Query,
+    Response,
+)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, undefer
+from typing import Iterator, List, Optional, Tuple, Union
+import hashlib
+import logging
 import tempfile
 import os
 import json
 
-from ..core.database import get_db
+from ..core.config import settings
+from ..core.database import get_async_db
 from ..core.auth import get_current_user
 from ..models.user import User
 from ..models.quiz import Quiz
 from ..models.question import Question
 from ..schemas.quiz import QuizCreate, Quiz as QuizSchema, QuizSummary, QuizUpdate
 from ..schemas.question import QuestionGenConfig, QuizSubmission, TextQuizRequest
-from ..services.nlp_service import NLPService
+from ..schemas.job import GenerationJob as GenerationJobSchema
+from ..models.generation_job import GenerationJob
+from ..services.generation_pool import GenerationPool, GenerationPoolFull
 from ..services.export_service import ExportService
+from ..services.quiz_store import list_user_quizzes, save_generated_quiz
+from ..services.grading import grade_submission
+from ..services.job_queue import JobQueue
+from ..services.dedup import BankDuplicateFilter
+from ..services.result_cache import (
+    content_digest,
+    generation_cache_key,
+    get_cached_questions,
+    store_questions,
+)
 
 router = APIRouter(prefix="/quiz", tags=["quiz"])
+logger = logging.getLogger(__name__)
 
 # Initialize services
-nlp_service = NLPService()
+# Generation runs on a bounded worker pool, each slot with its own NLPService,
+# so a large PDF never blocks the event loop for other requests
+generation_pool = GenerationPool(
+    mode=settings.generation_executor,
+    workers=settings.generation_workers,
+    max_queue=settings.generation_max_queue,
+)
 export_service = ExportService()
+# Background generation jobs are persisted and picked up by JobWorker processes
+job_queue = JobQueue(lease_seconds=settings.job_lease_seconds)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+def _iter_upload(file: UploadFile) -> Iterator[bytes]:
+    """
+    The spooled upload in UPLOAD_CHUNK_SIZE chunks, raising 413 once it
+    passes MAX_FILE_SIZE_MB.
+    """
+    max_bytes = settings.max_file_size_mb * 1024 * 1024
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"PDF exceeds the {settings.max_file_size_mb} MB upload limit",
+    )
+    if file.size is not None and file.size > max_bytes:
+        raise too_large
+
+    file.file.seek(0)
+    received = 0
+    for chunk in iter(lambda: file.file.read(UPLOAD_CHUNK_SIZE), b""):
+        received += len(chunk)
+        if received > max_bytes:
+            raise too_large
+        yield chunk
+
+
+def _copy_upload(file: UploadFile, directory: Optional[str] = None) -> Tuple[str, str]:
+    """Copy the upload to a new .pdf file in directory; (path, SHA-256)"""
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(
+        delete=False, suffix=".pdf", dir=directory
+    ) as target:
+        try:
+            for chunk in _iter_upload(file):
+                digest.update(chunk)
+                target.write(chunk)
+        except BaseException:
+            target.close()
+            os.unlink(target.name)
+            raise
+    return target.name, digest.hexdigest()
+
+
+def _read_upload(file: UploadFile) -> Tuple[Union[bytes, str], str]:
+    """
+    The upload as PDF bytes, or for uploads over UPLOAD_IN_MEMORY_MAX_MB the
+    path of a temp copy (the caller deletes it); plus its SHA-256.
+
+    Starlette has already spooled the whole body (in memory, past 1 MB in an
+    anonymous temp file) before the route runs, so this reads straight from
+    that spool rather than streaming the request. Oversized requests are
+    refused earlier by reject_oversized_uploads from their Content-Length;
+    the size check here only catches bodies that did not declare one. The
+    temp copy of a large upload is the one copy made: fitz's parallel page
+    extraction and the process executor need a path, which the spool lacks.
+    """
+    in_memory_max = settings.upload_in_memory_max_mb * 1024 * 1024
+    if file.size is not None and file.size > in_memory_max:
+        return _copy_upload(file)
+
+    content = b"".join(_iter_upload(file))
+    return content, hashlib.sha256(content).hexdigest()
+
+
+async def _receive_pdf_upload(file: UploadFile) -> Tuple[Union[bytes, str], str]:
+    """_read_upload() off the event loop (the spool may be on disk)"""
+    return await run_in_threadpool(_read_upload, file)
+
+
+async def _release_connection(db: AsyncSession):
+    """
+    End db's transaction before a long generation, so the connection goes
+    back to the pool instead of sitting idle in transaction; the next
+    statement (caching, saving the quiz) begins a fresh one.
+    """
+    await db.commit()
+
+
+async def _run_generation(method: str, *args):
+    """Run an NLPService generation method on the worker pool"""
+    try:
+        return await generation_pool.run(method, *args)
+    except GenerationPoolFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Quiz generation is at capacity, please retry shortly",
+            headers={"Retry-After": "10"},
+        )
 
 
 @router.post("/generate/from-text", response_model=QuizSchema)
 async def generate_quiz_from_text(
     request: TextQuizRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Generate a quiz from pasted text content"""
 
     print(f"Generating quiz from text: {len(request.text_content)} characters")
 
     try:
-        # Create quiz
-        quiz = Quiz(
-            title=request.title,
-            description=f"Generated from pasted text content",
-            user_id=current_user.id,
-        )
-        db.add(quiz)
-        db.commit()
-        db.refresh(quiz)
-
-        print(f"Created quiz with ID: {quiz.id}")
-
-        # Generate questions using NLP service
+        # Generate questions using NLP service (off the event loop)
         config_dict = request.config.dict()
-        questions_data = nlp_service.generate_questions_from_text(
-            request.text_content, config_dict
+        cache_key = generation_cache_key(
+            content_digest(request.text_content), config_dict
+        )
+        questions_data = (
+            await db.run_sync(get_cached_questions, cache_key) if cache_key else None
         )
 
-        print(f"Generated {len(questions_data)} questions from text")
-
-        # Create question objects
-        questions = []
-        for question_data in questions_data:
-            question = Question(quiz_id=quiz.id, **question_data)
-            questions.append(question)
+        if questions_data is None:
+            bank_filter = (
+                BankDuplicateFilter(current_user.id)
+                if request.config.avoid_bank_duplicates
+                else None
+            )
+            await _release_connection(db)
+            questions_data = await _run_generation(
+                "generate_questions_from_text",
+                request.text_content,
+                config_dict,
+                None,
+                bank_filter,
+            )
+            if cache_key:
+                await db.run_sync(store_questions, cache_key, questions_data)
+        else:
+            logger.info("Reusing cached questions for seeded request")
 
-        # Save all questions
-        if questions:
-            db.add_all(questions)
+        print(f"Generated {len(questions_data)} questions from text")
 
-        # Update quiz total questions
-        quiz.total_questions = len(questions)
-        db.commit()
-        db.refresh(quiz)
+        quiz = await db.run_sync(
+            save_generated_quiz,
+            current_user.id,
+            request.title,
+            "Generated from pasted text content",
+            questions_data,
+        )
 
         print(f"Text-based quiz generation completed successfully")
         return quiz
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error during text-based quiz generation: {str(e)}")
         raise HTTPException(
@@ -86,7 +216,7 @@ async def generate_quiz(
     config: str = Form(...),  # Accept as string and parse JSON
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Generate a quiz from uploaded PDF"""
 
@@ -107,106 +237,56 @@ async def generate_quiz(
             detail="Only PDF files are supported",
         )
 
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        content = await file.read()
-        tmp_file.write(content)
-        tmp_file_path = tmp_file.name
+    # Small uploads stay in memory, large ones are streamed to a temp file
+    pdf_source, pdf_digest = await _receive_pdf_upload(file)
 
     try:
-        # Extract text from PDF
-        pages_content = nlp_service.extract_text_from_pdf(tmp_file_path)
+        config_dict = question_config.dict()
+        cache_key = generation_cache_key(pdf_digest, config_dict)
+        questions_data = (
+            await db.run_sync(get_cached_questions, cache_key) if cache_key else None
+        )
+
+        if questions_data is None:
+            # Pages are streamed out of the PDF, parsed once and indexed as they
+            # are read, then every question type is generated (off the event loop)
+            bank_filter = (
+                BankDuplicateFilter(current_user.id)
+                if question_config.avoid_bank_duplicates
+                else None
+            )
+            await _release_connection(db)
+            questions_data = await _run_generation(
+                "generate_questions_from_pdf",
+                pdf_source,
+                config_dict,
+                None,
+                bank_filter,
+            )
+            if cache_key and questions_data is not None:
+                await db.run_sync(store_questions, cache_key, questions_data)
+        else:
+            logger.info("Reusing cached questions for seeded request")
 
-        if not pages_content:
+        if questions_data is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No text content found in PDF",
             )
 
-        print(f"Extracted {len(pages_content)} pages from PDF")
-
-        # Create quiz
-        quiz = Quiz(
-            title=title,
-            description=f"Generated from {file.filename}",
-            user_id=current_user.id,
+        quiz = await db.run_sync(
+            save_generated_quiz,
+            current_user.id,
+            title,
+            f"Generated from {file.filename}",
+            questions_data,
         )
-        db.add(quiz)
-        db.commit()
-        db.refresh(quiz)
-
-        print(f"Created quiz with ID: {quiz.id}")
-
-        # Generate questions
-        questions = []
-
-        # Generate MCQs
-        print(f"Generating {question_config.mcq_count} MCQ questions...")
-        for i in range(question_config.mcq_count):
-            try:
-                page_content = nlp_service._select_random_content(pages_content)
-                question_data = nlp_service.generate_mcq_question(
-                    page_content["content"], page_content["page_number"]
-                )
-                if question_data:
-                    question = Question(quiz_id=quiz.id, **question_data)
-                    questions.append(question)
-                    print(f"Generated MCQ {i+1}")
-                else:
-                    print(f"Failed to generate MCQ {i+1}")
-            except Exception as e:
-                print(f"Error generating MCQ {i+1}: {str(e)}")
-
-        # Generate Short Answer questions
-        print(
-            f"Generating {question_config.short_answer_count} Short Answer questions..."
-        )
-        for i in range(question_config.short_answer_count):
-            try:
-                page_content = nlp_service._select_random_content(pages_content)
-                question_data = nlp_service.generate_short_answer_question(
-                    page_content["content"], page_content["page_number"]
-                )
-                if question_data:
-                    question = Question(quiz_id=quiz.id, **question_data)
-                    questions.append(question)
-                    print(f"Generated Short Answer {i+1}")
-                else:
-                    print(f"Failed to generate Short Answer {i+1}")
-            except Exception as e:
-                print(f"Error generating Short Answer {i+1}: {str(e)}")
-
-        # Generate True/False questions
-        print(f"Generating {question_config.true_false_count} True/False questions...")
-        for i in range(question_config.true_false_count):
-            try:
-                page_content = nlp_service._select_random_content(pages_content)
-                question_data = nlp_service.generate_true_false_question(
-                    page_content["content"], page_content["page_number"]
-                )
-                if question_data:
-                    question = Question(quiz_id=quiz.id, **question_data)
-                    questions.append(question)
-                    print(f"Generated True/False {i+1}")
-                else:
-                    print(f"Failed to generate True/False {i+1}")
-            except Exception as e:
-                print(f"Error generating True/False {i+1}: {str(e)}")
-
-        print(f"Total questions generated: {len(questions)}")
-
-        # Save all questions
-        if questions:
-            db.add_all(questions)
-
-        # Update quiz total questions
-        quiz.total_questions = len(questions)
-        db.commit()
-        db.refresh(quiz)
 
         print(f"Quiz generation completed successfully")
         return quiz
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error during quiz generation: {str(e)}")
         raise HTTPException(
@@ -216,15 +296,140 @@ async def generate_quiz(
 
     finally:
         # Clean up temporary file
-        os.unlink(tmp_file_path)
+        if isinstance(pdf_source, str):
+            os.unlink(pdf_source)
+
+
+def _store_job_upload(file: UploadFile) -> str:
+    """Copy an upload into JOB_UPLOAD_DIR, where it stays until a worker has processed it"""
+    os.makedirs(settings.job_upload_dir, exist_ok=True)
+    path, _ = _copy_upload(file, settings.job_upload_dir)
+    return path
+
+
+@router.post(
+    "/jobs",
+    response_model=GenerationJobSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_generation_job(
+    title: str = Form(...),
+    config: str = Form(...),  # Accept as string and parse JSON
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Queue quiz generation from an uploaded PDF; poll GET /quiz/jobs/{job_id}"""
+
+    try:
+        config_dict = json.loads(config)
+        question_config = QuestionGenConfig(**config_dict)
+    except (json.JSONDecodeError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid config format: {str(e)}",
+        )
+
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are supported",
+        )
+
+    source_path = await run_in_threadpool(_store_job_upload, file)
+
+    try:
+        job = await db.run_sync(
+            job_queue.enqueue,
+            current_user.id,
+            title,
+            f"Generated from {file.filename}",
+            "pdf",
+            question_config.dict(),
+            source_path=source_path,
+        )
+    except Exception:
+        os.unlink(source_path)
+        raise
+
+    logger.info("Queued generation job %s for %s", job.id, file.filename)
+    return job
+
+
+@router.post(
+    "/jobs/from-text",
+    response_model=GenerationJobSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_text_generation_job(
+    request: TextQuizRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Queue quiz generation from pasted text content"""
+
+    job = await db.run_sync(
+        job_queue.enqueue,
+        current_user.id,
+        request.title,
+        "Generated from pasted text content",
+        "text",
+        request.config.dict(),
+        text_content=request.text_content,
+    )
+
+    logger.info(
+        "Queued generation job %s for %d characters",
+        job.id,
+        len(request.text_content),
+    )
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobSchema)
+async def get_generation_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Status and progress of a generation job; quiz_id is set once it succeeds"""
+    job = await db.scalar(
+        select(GenerationJob).where(
+            GenerationJob.id == job_id, GenerationJob.user_id == current_user.id
+        )
+    )
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+
+    return job
 
 
 @router.get("/", response_model=List[QuizSummary])
 async def get_user_quizzes(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Get all quizzes for the current user"""
-    quizzes = db.query(Quiz).filter(Quiz.user_id == current_user.id).all()
+    """
+    Get the current user's quizzes, newest first, one page at a time.
+
+    When there are more, the X-Next-Cursor response header holds the cursor
+    to pass back for the next page.
+    """
+    try:
+        quizzes, next_cursor = await list_user_quizzes(
+            db, current_user.id, limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return quizzes
 
 
@@ -232,13 +437,13 @@ async def get_user_quizzes(
 async def get_quiz(
     quiz_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get a specific quiz with questions"""
-    quiz = (
-        db.query(Quiz)
-        .filter(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
-        .first()
+    quiz = await db.scalar(
+        select(Quiz)
+        .options(selectinload(Quiz.questions))
+        .where(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
     )
 
     if not quiz:
@@ -254,18 +459,19 @@ async def submit_quiz(
     quiz_id: int,
     submission: QuizSubmission,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Submit quiz answers and calculate score"""
     print(f"Received submission for quiz {quiz_id}")
     print(f"Number of answers: {len(submission.answers)}")
     print(f"Submission data: {submission}")
 
-    # Check if quiz exists and belongs to user
-    quiz = (
-        db.query(Quiz)
-        .filter(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
-        .first()
+    # Check if quiz exists and belongs to user; its questions come with it in
+    # one more query, so grading costs the same number of queries at any size
+    quiz = await db.scalar(
+        select(Quiz)
+        .options(selectinload(Quiz.questions))
+        .where(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
     )
 
     if not quiz:
@@ -290,32 +496,8 @@ async def submit_quiz(
         )
 
     # Calculate score and build detailed per-question results
-    correct_answers = 0
     total_questions = len(quiz.questions)
-    results = []
-
-    for answer in submission.answers:
-        question = db.query(Question).filter(Question.id == answer.question_id).first()
-        if question:
-            is_correct = (
-                question.correct_answer.lower().strip()
-                == answer.user_answer.lower().strip()
-            )
-            if is_correct:
-                correct_answers += 1
-
-            results.append(
-                {
-                    "question_id": question.id,
-                    "question_text": question.question_text,
-                    "user_answer": answer.user_answer,
-                    "correct_answer": question.correct_answer,
-                    "is_correct": is_correct,
-                    "source_page": question.source_page,
-                    "source_context": question.source_context_snippet,
-                    "bloom_level": question.bloom_level,
-                }
-            )
+    correct_answers, results = grade_submission(quiz.questions, submission.answers)
 
     # Update quiz with aggregated score and persist detailed results
     score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
@@ -328,7 +510,7 @@ async def submit_quiz(
         # Fallback: if something isn't serializable, skip storing details
         quiz.results_data = None
 
-    db.commit()
+    await db.commit()
 
     print(f"Quiz submitted successfully. Score: {score}%")
 
@@ -344,7 +526,7 @@ async def submit_quiz(
 async def get_quiz_results(
     quiz_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get quiz results.
@@ -353,13 +535,13 @@ async def get_quiz_results(
     frontend can show which questions were right/wrong, even when the user comes
     back to the results page later (e.g. from the dashboard).
     """
-    quiz = (
-        db.query(Quiz)
-        .filter(
+    quiz = await db.scalar(
+        select(Quiz)
+        .options(undefer(Quiz.results_data))
+        .where(
             Quiz.id == quiz_id,
             Quiz.user_id == current_user.id,
         )
-        .first()
     )
 
     if not quiz:
@@ -410,13 +592,13 @@ async def get_quiz_results(
 async def export_quiz_docx(
     quiz_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Export quiz as Word document"""
-    quiz = (
-        db.query(Quiz)
-        .filter(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
-        .first()
+    quiz = await db.scalar(
+        select(Quiz)
+        .options(selectinload(Quiz.questions))
+        .where(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
     )
 
     if not quiz:
@@ -465,13 +647,13 @@ async def update_quiz(
     quiz_id: int,
     quiz_update: QuizUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update quiz details"""
-    quiz = (
-        db.query(Quiz)
-        .filter(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
-        .first()
+    quiz = await db.scalar(
+        select(Quiz)
+        .options(selectinload(Quiz.questions))
+        .where(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
     )
 
     if not quiz:
@@ -483,8 +665,8 @@ async def update_quiz(
     for field, value in quiz_update.dict(exclude_unset=True).items():
         setattr(quiz, field, value)
 
-    db.commit()
-    db.refresh(quiz)
+    # Nothing is expired on commit, so the quiz needs no refresh
+    await db.commit()
 
     return quiz
 
@@ -493,13 +675,18 @@ async def update_quiz(
 async def delete_quiz(
     quiz_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a quiz"""
-    quiz = (
-        db.query(Quiz)
-        .filter(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
-        .first()
+    # The delete cascades to the questions and their duplicate-index rows,
+    # so load all of them up front
+    quiz = await db.scalar(
+        select(Quiz)
+        .options(
+            selectinload(Quiz.questions).selectinload(Question.signature),
+            selectinload(Quiz.questions).selectinload(Question.lsh_bands),
+        )
+        .where(Quiz.id == quiz_id, Quiz.user_id == current_user.id)
     )
 
     if not quiz:
@@ -507,7 +694,7 @@ async def delete_quiz(
             status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found"
         )
 
-    db.delete(quiz)
-    db.commit()
+    await db.delete(quiz)
+    await db.commit()
 
     return {"message": "Quiz deleted successfully"}
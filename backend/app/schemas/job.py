@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class GenerationJob(BaseModel):
+    id: int
+    title: str
+    status: str  # queued, running, succeeded, failed
+    progress: float
+    attempts: int
+    max_attempts: int
+    quiz_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -42,6 +42,13 @@ class QuestionGenConfig(BaseModel):
     true_false_count: int = 2
     difficulty_distribution: dict = {"Easy": 30, "Medium": 50, "Hard": 20}
     bloom_levels: List[str] = ["Remember", "Understand", "Apply", "Analyze"]
+    # Optional 1-based, inclusive page range to generate from
+    start_page: Optional[int] = None
+    end_page: Optional[int] = None
+    # Also skip questions that near-duplicate ones already in the user's quizzes
+    avoid_bank_duplicates: bool = False
+    # Same seed + same content + same config = same quiz (served from cache)
+    seed: Optional[int] = None
 
 
 class TextQuizRequest(BaseModel):
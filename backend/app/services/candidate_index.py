@@ -0,0 +1,150 @@
+import random
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Sentence categories a generator can draw from
+DEFINITION = "definition"  # "X is Y." -> What is X?
+ENTITY = "entity"  # has a PERSON/ORG/GPE/DATE to blank out
+NUMERIC = "numeric"  # has a number that can be altered for a false statement
+NEGATABLE = "negatable"  # has a copula that can be negated for a false statement
+
+QA_ENTITY_LABELS = ("PERSON", "ORG", "GPE", "DATE")
+NEGATABLE_PATTERN = re.compile(r" (is|are|was|were) ")
+
+MAX_DEFINITION_CHARS = 150
+MAX_ENTITY_SENTENCE_CHARS = 200
+MIN_STATEMENT_CHARS = 20
+
+
+class Candidate:
+    """One sentence that a generator can turn into a question"""
+
+    __slots__ = ("kind", "sentence", "page_number", "analysis", "entity")
+
+    def __init__(self, kind: str, sentence, page_number: int, analysis, entity=None):
+        self.kind = kind
+        self.sentence = sentence  # spaCy Span
+        self.page_number = page_number
+        self.analysis = analysis  # ChunkAnalysis of the chunk the sentence is in
+        self.entity = entity  # the entity to blank out, for ENTITY candidates
+
+    @property
+    def key(self) -> Tuple[int, str]:
+        return (self.page_number, self.sentence.text.strip())
+
+
+def classify_sentence(sentence) -> Dict[str, Optional[object]]:
+    """
+    Categories this sentence qualifies for, mapped to the entity to use
+    (ENTITY only; None otherwise). Mirrors the checks the generators make.
+    """
+    text = sentence.text.strip()
+    kinds = {}
+
+    if " is " in text and len(text) < MAX_DEFINITION_CHARS:
+        subject, answer = text.split(" is ", 1)
+        if subject.strip() and answer.strip(" ."):
+            kinds[DEFINITION] = None
+
+    if len(text) < MAX_ENTITY_SENTENCE_CHARS:
+        for ent in sentence.ents:
+            if ent.label_ in QA_ENTITY_LABELS:
+                kinds[ENTITY] = ent
+                break
+
+    if len(text) > MIN_STATEMENT_CHARS:
+        if any(token.like_num for token in sentence):
+            kinds[NUMERIC] = None
+        if NEGATABLE_PATTERN.search(text):
+            kinds[NEGATABLE] = None
+
+    return kinds
+
+
+class CandidateIndex:
+    """
+    Per-document index of question-worthy sentences, built in one pass.
+
+    Every sentence of every analyzed chunk is classified once (see
+    classify_sentence()) and kept in a bounded reservoir per category, so the
+    index stays the same size however long the document is. Generators then
+    take() candidates without replacement: each sentence is used for at most
+    one question, and a quiz costs one generation per candidate drawn instead
+    of retrying random chunks until one happens to work.
+    """
+
+    def __init__(self, max_per_kind: int = 256, rng: Optional[random.Random] = None):
+        self.max_per_kind = max_per_kind
+        self.rng = rng or random
+        self._candidates: Dict[str, List[Candidate]] = {
+            kind: [] for kind in (DEFINITION, ENTITY, NUMERIC, NEGATABLE)
+        }
+        self._seen: Dict[str, int] = {kind: 0 for kind in self._candidates}
+        self._used: Set[Tuple[int, str]] = set()
+        self.sentences_indexed = 0
+
+    def add_chunk(
+        self,
+        analysis,
+        page_number: int,
+        detach: Optional[Callable[[Candidate], Candidate]] = None,
+    ):
+        """
+        detach, if given, copies a candidate that is kept into one that no
+        longer references analysis, so the chunk's Doc can be freed after
+        indexing (see NLPService.iter_document_analysis() windows)
+        """
+        for sentence in analysis.sentences:
+            self.sentences_indexed += 1
+            for kind, entity in classify_sentence(sentence).items():
+                self._offer(
+                    Candidate(kind, sentence, page_number, analysis, entity), detach
+                )
+
+    def _offer(
+        self,
+        candidate: Candidate,
+        detach: Optional[Callable[[Candidate], Candidate]] = None,
+    ):
+        # Reservoir sampling keeps a uniform sample of each category
+        pool = self._candidates[candidate.kind]
+        self._seen[candidate.kind] += 1
+        if len(pool) < self.max_per_kind:
+            pool.append(detach(candidate) if detach else candidate)
+        else:
+            slot = self.rng.randrange(self._seen[candidate.kind])
+            if slot < self.max_per_kind:
+                pool[slot] = detach(candidate) if detach else candidate
+
+    def remaining(self, kinds: Iterable[str]) -> int:
+        return sum(len(self._candidates[kind]) for kind in kinds)
+
+    def counts(self) -> Dict[str, int]:
+        return {kind: len(pool) for kind, pool in self._candidates.items()}
+
+    def take(self, kinds: Iterable[str]) -> Optional[Candidate]:
+        """
+        Remove and return a random unused candidate from any of the given
+        categories, or None once they are exhausted. A sentence listed under
+        several categories is only ever handed out once.
+        """
+        kinds = list(kinds)
+        while True:
+            total = self.remaining(kinds)
+            if total == 0:
+                return None
+
+            pick = self.rng.randrange(total)
+            for kind in kinds:
+                pool = self._candidates[kind]
+                if pick < len(pool):
+                    break
+                pick -= len(pool)
+
+            # Swap-remove: O(1), order within a pool doesn't matter
+            pool[pick], pool[-1] = pool[-1], pool[pick]
+            candidate = pool.pop()
+            if candidate.key in self._used:
+                continue
+            self._used.add(candidate.key)
+            return candidate
@@ -0,0 +1,291 @@
+"""
+Near-duplicate detection for generated questions.
+
+Question texts are shingled into character n-grams and summarized by a
+MinHash signature; LSH banding turns each signature into a handful of hash
+keys so candidate duplicates are found by key lookup instead of comparing
+against every question. Two questions are duplicates when their estimated
+Jaccard similarity reaches the threshold.
+
+- LSHIndex: in-memory, used within one generation run
+- find_bank_duplicates() / index_questions(): the same scheme over a user's
+  stored questions (question_signatures / question_lsh_bands tables)
+- backfill_signatures(): indexes stored questions that have no signature yet
+  (`python -m app.backfill_signatures`)
+"""
+
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Union
+
+import numpy as np
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..core.database import engine
+from ..models.question import Question
+from ..models.quiz import Quiz
+from ..models.question_signature import QuestionLSHBand, QuestionSignature
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def normalize_question(text: str) -> str:
+    """Lower-case words only, so punctuation and spacing changes don't matter"""
+    return " ".join(re.findall(r"[a-z0-9_]+", text.lower()))
+
+
+class MinHasher:
+    """
+    num_perm-value MinHash over character shingles, split into `bands` LSH
+    bands of num_perm / bands rows. With the defaults (100 / 20 bands of 5) a
+    pair at Jaccard 0.8 shares a band with probability > 0.999, a pair at 0.3
+    with probability < 0.05, which keeps bank lookups to a few candidates.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 100,
+        bands: int = 20,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Fixed seed: signatures are stored, so they must be stable across runs
+        rng = np.random.RandomState(seed)
+        # a, b < 2**32 and hashes < 2**32, so a * h + b never overflows uint64
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[str]:
+        text = normalize_question(text)
+        if len(text) <= self.shingle_size:
+            return {text}
+        size = self.shingle_size
+        return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in self.shingles(text)),
+            dtype=np.uint64,
+        )
+        # All permutations of all shingles in one (shingles, num_perm) array
+        permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+    def band_hashes(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit key per band (fits a BigInteger column)"""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows : (band + 1) * self.rows]
+            digest = hashlib.blake2b(
+                band.to_bytes(2, "little") + rows.tobytes(), digest_size=8
+            ).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    @staticmethod
+    def similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """Estimated Jaccard similarity of signature to each row of others"""
+        return (others == signature).mean(axis=1)
+
+
+class LSHIndex:
+    """In-memory MinHash LSH index over arbitrary keys"""
+
+    def __init__(self, hasher: MinHasher, threshold: float = 0.8):
+        self.hasher = hasher
+        self.threshold = threshold
+        self._buckets: Dict[int, List[Hashable]] = defaultdict(list)
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def query(self, signature: np.ndarray) -> List[Hashable]:
+        """Keys whose estimated similarity to signature reaches the threshold"""
+        candidates = {
+            key
+            for band in self.hasher.band_hashes(signature)
+            for key in self._buckets.get(band, ())
+        }
+        if not candidates:
+            return []
+        keys = list(candidates)
+        scores = self.hasher.similarity(
+            signature, np.stack([self._signatures[key] for key in keys])
+        )
+        return [key for key, score in zip(keys, scores) if score >= self.threshold]
+
+    def add(self, key: Hashable, signature: np.ndarray):
+        self._signatures[key] = signature
+        for band in self.hasher.band_hashes(signature):
+            self._buckets[band].append(key)
+
+    def add_if_new(self, key: Hashable, text: str) -> bool:
+        """Index text under key unless it duplicates something already indexed"""
+        signature = self.hasher.signature(text)
+        if self.query(signature):
+            return False
+        self.add(key, signature)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+# Shared by generation and storage so stored signatures stay comparable
+default_hasher = MinHasher()
+DUPLICATE_THRESHOLD = 0.8
+
+
+# Built once: the lookup is on the generation hot path, so skip rebuilding the
+# statement (and its cache key) for every question
+_BANK_CANDIDATES = select(
+    QuestionSignature.question_id, QuestionSignature.signature
+).where(
+    QuestionSignature.question_id.in_(
+        select(QuestionLSHBand.question_id)
+        .where(
+            QuestionLSHBand.user_id == bindparam("user_id"),
+            QuestionLSHBand.band_hash.in_(bindparam("band_hashes", expanding=True)),
+        )
+        .scalar_subquery()
+    )
+)
+
+
+def find_bank_duplicates(
+    db: Union[Session, Connection],
+    user_id: int,
+    text: str,
+    hasher: MinHasher = default_hasher,
+    threshold: float = DUPLICATE_THRESHOLD,
+) -> List[int]:
+    """
+    Ids of the user's stored questions that are near-duplicates of text.
+
+    One indexed lookup on (user_id, band_hash) finds the candidates, then only
+    their signatures are loaded and compared, so the cost depends on how many
+    similar questions exist rather than on the size of the bank.
+    """
+    signature = hasher.signature(text)
+    rows = db.execute(
+        _BANK_CANDIDATES,
+        {"user_id": user_id, "band_hashes": hasher.band_hashes(signature)},
+    ).all()
+    if not rows:
+        return []
+
+    others = np.frombuffer(b"".join(blob for _, blob in rows), dtype="<u8")
+    scores = hasher.similarity(signature, others.reshape(len(rows), -1))
+    return [
+        question_id
+        for (question_id, _), score in zip(rows, scores)
+        if score >= threshold
+    ]
+
+
+def index_questions(
+    db: Session,
+    user_id: int,
+    questions: Iterable[Question],
+    hasher: MinHasher = default_hasher,
+):
+    """Add signature and band rows for questions that already have ids (flushed)"""
+    signature_rows = []
+    band_rows = []
+    for question in questions:
+        signature = hasher.signature(question.question_text)
+        signature_rows.append(
+            {
+                "question_id": question.id,
+                "user_id": user_id,
+                "signature": signature.astype("<u8").tobytes(),
+            }
+        )
+        band_rows.extend(
+            {"user_id": user_id, "band_hash": band, "question_id": question.id}
+            for band in hasher.band_hashes(signature)
+        )
+
+    # Plain executemany inserts; these rows are never needed as ORM objects
+    if signature_rows:
+        db.execute(insert(QuestionSignature), signature_rows)
+        db.execute(insert(QuestionLSHBand), band_rows)
+
+
+def backfill_signatures(db: Session, batch_size: int = 1000) -> int:
+    """
+    Index stored questions that have no signature yet (e.g. saved before
+    near-duplicate detection existed), one committed batch at a time.
+    Safe to re-run; returns the number of questions indexed.
+    """
+    indexed = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Question.id, Question.question_text, Quiz.user_id)
+            .join(Quiz, Question.quiz_id == Quiz.id)
+            .outerjoin(QuestionSignature, QuestionSignature.question_id == Question.id)
+            .where(QuestionSignature.question_id.is_(None), Question.id > last_id)
+            .order_by(Question.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return indexed
+
+        by_user = defaultdict(list)
+        for row in rows:
+            by_user[row.user_id].append(row)
+        for user_id, questions in by_user.items():
+            index_questions(db, user_id, questions)
+        db.commit()
+
+        indexed += len(rows)
+        last_id = rows[-1].id
+
+
+class BankDuplicateFilter:
+    """
+    Picklable is_duplicate callback for NLPService generation: true when a
+    question text near-duplicates one already in the user's bank.
+
+    The first lookup opens one connection, reused for the rest of the
+    generation run until close() (NLPService calls it when the run ends).
+    Each lookup ends its read transaction, so none stays open while
+    questions are generated. Only user_id is pickled, so a process-pool
+    worker opens its own connection.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self._connection: Optional[Connection] = None
+
+    def __call__(self, question_text: str) -> bool:
+        if self._connection is None:
+            self._connection = engine.connect()
+        try:
+            return bool(
+                find_bank_duplicates(self._connection, self.user_id, question_text)
+            )
+        finally:
+            self._connection.rollback()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __getstate__(self):
+        return {"user_id": self.user_id}
+
+    def __setstate__(self, state):
+        self.__init__(state["user_id"])
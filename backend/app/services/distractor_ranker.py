@@ -0,0 +1,133 @@
+import re
+from typing import FrozenSet, List, Tuple
+
+import numpy as np
+
+# Knuth multiplicative hash constant; deterministic across processes unlike hash()
+_HASH_MULTIPLIER = np.uint64(2654435761)
+
+# Possessives go with their apostrophe: "Newton's" compares as "newton"
+_APOSTROPHES = re.compile(r"['\u2019](s\b)?")
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase text with punctuation removed and whitespace collapsed"""
+    text = _APOSTROPHES.sub("", text.lower())
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+class DistractorRanker:
+    """
+    Ranks candidate distractors by surface similarity to the correct answer.
+
+    Texts are embedded as L2-normalized hashed character-trigram vectors; the
+    whole candidate list is embedded and scored against the answer with
+    NumPy array operations (no per-pair Python loop), so ranking stays cheap
+    however many same-type entities a document has.
+
+    The most similar candidates make the most plausible wrong options, but
+    other names for the answer score just as high ("Gandhi" for "Mahatma
+    Gandhi"), so a candidate is skipped as a variant of the answer (or of an
+    already chosen distractor) when, ignoring case and punctuation, its words
+    are a subset or superset of the other's, it is a substring of the other,
+    or it scores at or above near_duplicate_threshold.
+    """
+
+    def __init__(self, dim_bits: int = 10, near_duplicate_threshold: float = 0.8):
+        self.dim_bits = dim_bits
+        self.dim = 1 << dim_bits
+        self.near_duplicate_threshold = near_duplicate_threshold
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), dim) float32 matrix, one unit-length row per text"""
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        # Pad with spaces so word boundaries form their own trigrams
+        encoded = [f" {normalize(text)} ".encode("utf-8") for text in texts]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64)
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        if len(data) < 3:
+            return np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        # A trigram is valid only if all three bytes belong to the same text
+        valid = rows[:-2] == rows[2:]
+        codes = (data[:-2] << np.uint64(16)) | (data[1:-1] << np.uint64(8)) | data[2:]
+        buckets = ((codes * _HASH_MULTIPLIER) & np.uint64(0xFFFFFFFF)) >> np.uint64(
+            32 - self.dim_bits
+        )
+        # Count trigrams per (row, bucket) in one pass over the flattened matrix
+        flat_index = rows[:-2][valid] * self.dim + buckets[valid].astype(np.int64)
+        matrix = (
+            np.bincount(flat_index, minlength=len(texts) * self.dim)
+            .reshape(len(texts), self.dim)
+            .astype(np.float32)
+        )
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def rank(self, answer: str, candidates: List[str], k: int = 3) -> List[str]:
+        """Up to k candidates, most similar first, with variants removed"""
+        if not candidates or k <= 0:
+            return []
+
+        matrix = self.embed([answer] + candidates)
+        candidate_matrix = matrix[1:]
+        scores = candidate_matrix @ matrix[0]
+
+        answer_key = self._key(answer)
+        keys = [self._key(candidate) for candidate in candidates]
+        variant = np.fromiter(
+            (self._is_variant(key, answer_key) for key in keys),
+            dtype=bool,
+            count=len(keys),
+        )
+
+        # Stable sort keeps the caller's order (e.g. frequency) among ties
+        order = np.argsort(-scores, kind="stable")
+        order = order[(scores[order] < self.near_duplicate_threshold) & ~variant[order]]
+
+        # Only the head of the ranking can be picked; compare it in one block
+        head = order[: k * 4]
+        pairwise = candidate_matrix[head] @ candidate_matrix[head].T
+        picked = []
+        for position in range(len(head)):
+            if picked and pairwise[position, picked].max() >= (
+                self.near_duplicate_threshold
+            ):
+                continue
+            key = keys[head[position]]
+            if any(
+                self._is_variant(key, keys[head[other]])
+                or self._is_variant(keys[head[other]], key)
+                for other in picked
+            ):
+                continue
+            picked.append(position)
+            if len(picked) == k:
+                break
+
+        return [candidates[head[position]] for position in picked]
+
+    @staticmethod
+    def _key(text: str) -> Tuple[str, FrozenSet[str]]:
+        normalized = normalize(text)
+        return normalized, frozenset(normalized.split())
+
+    @staticmethod
+    def _is_variant(
+        key: Tuple[str, FrozenSet[str]], of: Tuple[str, FrozenSet[str]]
+    ) -> bool:
+        """Whether the text behind key is another way of writing the text behind of"""
+        text, words = key
+        other_text, other_words = of
+        return (
+            not words
+            or words <= other_words
+            or words >= other_words
+            or text in other_text
+        )
@@ -0,0 +1,73 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set
+
+
+class EntityInventory:
+    """
+    Document-wide named entities, grouped by label, built once per upload.
+
+    Entities are counted (keyed case-insensitively, keeping the first surface
+    form seen) along with the pages they appear on. Noun frequencies from the
+    same chunks are merged as well, for when a label has too few members.
+    Lookups by label and by entity text are dictionary accesses; the
+    frequency-ranked list for a label is computed once and cached until more
+    chunks are added.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, Counter] = defaultdict(Counter)
+        self._surface: Dict[str, str] = {}
+        self._pages: Dict[str, Set[int]] = defaultdict(set)
+        self._label_of: Dict[str, str] = {}
+        self._nouns: Counter = Counter()
+        self._ranked: Dict[str, List[str]] = {}
+        self._ranked_nouns: Optional[List[str]] = None
+
+    def add_chunk(self, analysis, page_number: int):
+        """Merge a ChunkAnalysis; its entities and nouns are already extracted"""
+        for ent in analysis.doc.ents:
+            text = ent.text.strip()
+            if len(text) <= 1:
+                continue
+            key = text.lower()
+            self._surface.setdefault(key, text)
+            self._counts[ent.label_][key] += 1
+            self._pages[key].add(page_number)
+            # An entity tagged with several labels is filed under its first one
+            self._label_of.setdefault(key, ent.label_)
+            self._ranked.pop(ent.label_, None)
+
+        if analysis.noun_frequencies:
+            self._nouns.update(analysis.noun_frequencies)
+            self._ranked_nouns = None
+
+    def labels(self) -> List[str]:
+        return list(self._counts)
+
+    def entities(self, label: str) -> List[str]:
+        """Entities with this label, most frequent first"""
+        ranked = self._ranked.get(label)
+        if ranked is None:
+            counts = self._counts.get(label, Counter())
+            ranked = [self._surface[key] for key, _ in counts.most_common()]
+            self._ranked[label] = ranked
+        return ranked
+
+    def label_of(self, text: str) -> Optional[str]:
+        return self._label_of.get(text.strip().lower())
+
+    def frequency(self, text: str) -> int:
+        key = text.strip().lower()
+        label = self._label_of.get(key)
+        return self._counts[label][key] if label else 0
+
+    def pages_of(self, text: str) -> List[int]:
+        return sorted(self._pages.get(text.strip().lower(), ()))
+
+    def common_nouns(self, limit: int = 10) -> List[str]:
+        if self._ranked_nouns is None:
+            self._ranked_nouns = [noun for noun, _ in self._nouns.most_common()]
+        return self._ranked_nouns[:limit]
+
+    def __len__(self) -> int:
+        return len(self._label_of)
@@ -2,6 +2,7 @@ from docx import Document
 from docx.shared import Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from typing import List
+from ..core.metrics import observe_stage
 from ..models.quiz import Quiz
 from ..models.question import Question
 import io
@@ -11,6 +12,7 @@ class ExportService:
     def __init__(self):
         pass
 
+    @observe_stage("docx_export")
     def generate_exam_paper(self, quiz: Quiz) -> io.BytesIO:
         """Generate a printable exam paper in Word format"""
         doc = Document()
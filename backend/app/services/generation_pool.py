@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from .nlp_service import NLPService
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationPoolFull(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+# Set in each worker process by _init_process_worker()
+_process_service = None
+
+
+def _init_process_worker(service_factory: Callable[[], NLPService]):
+    global _process_service
+    _process_service = service_factory()
+
+
+def _call_in_process(method: str, args: tuple):
+    return getattr(_process_service, method)(*args)
+
+
+def _warm_up_process(_):
+    _process_service.warm_up()
+
+
+class GenerationPool:
+    """
+    Runs CPU-bound quiz generation (PyMuPDF + spaCy) off the event loop.
+
+    - thread mode: `workers` threads; each call checks out an NLPService from
+      a pool of per-slot instances, so no two generations share a pipeline
+    - process mode: `workers` spawned processes, each building its own
+      NLPService once at start-up
+
+    At most `workers + max_queue` generations are admitted at a time; run()
+    raises GenerationPoolFull beyond that instead of letting work pile up.
+    NLPService instances are only built when the first generation needs one,
+    or ahead of time by warm_up().
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 2,
+        max_queue: int = 8,
+        service_factory: Callable[[], NLPService] = NLPService,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown generation executor mode: {mode}")
+
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.service_factory = service_factory
+
+        self._idle_services: "queue.Queue[NLPService]" = queue.Queue()
+        # NLPService instances built or being built, never more than `workers`
+        self._services_built = 0
+        self._admitted = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+        self.warmed_up = False
+        self.warm_up_error = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._admitted
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.mode == "process":
+                # spawn: forking a threaded server process is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_process_worker,
+                    initargs=(self.service_factory,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="quiz-generation"
+                )
+        return self._executor
+
+    def warm_up(self):
+        """
+        Build and exercise every slot's NLPService now rather than on the first
+        requests. Blocking; run it off the event loop. Sets warmed_up, or
+        warm_up_error if the models could not be loaded.
+        """
+        try:
+            if self.mode == "process":
+                # Each call runs in a worker whose initializer loaded the models
+                list(self._get_executor().map(_warm_up_process, range(self.workers)))
+            else:
+                while self._reserve_service_slot():
+                    self._idle_services.put(self._build_service(warm_up=True))
+        except Exception as e:
+            self.warm_up_error = str(e)
+            logger.warning("Generation pool warm-up failed: %s", e)
+            return
+        self.warmed_up = True
+
+    def _reserve_service_slot(self) -> bool:
+        """Claim the right to build one more NLPService, if under `workers`"""
+        with self._lock:
+            if self._services_built >= self.workers:
+                return False
+            self._services_built += 1
+            return True
+
+    def _build_service(self, warm_up: bool = False) -> NLPService:
+        """Build an NLPService for a reserved slot (released again on failure)"""
+        try:
+            service = self.service_factory()
+            if warm_up:
+                service.warm_up()
+            return service
+        except BaseException:
+            with self._lock:
+                self._services_built -= 1
+            raise
+
+    def _checkout_service(self) -> NLPService:
+        """
+        An idle NLPService; one is only built while fewer than `workers` exist
+        (counting those warm_up() is still building), otherwise this waits for
+        one to be built or handed back.
+        """
+        try:
+            return self._idle_services.get_nowait()
+        except queue.Empty:
+            pass
+        if self._reserve_service_slot():
+            return self._build_service()
+        return self._idle_services.get()
+
+    def _call_in_thread(self, method: str, args: tuple):
+        service = self._checkout_service()
+        try:
+            return getattr(service, method)(*args)
+        finally:
+            self._idle_services.put(service)
+
+    async def run(self, method: str, *args) -> Any:
+        """Call NLPService.<method>(*args) on a worker slot and await the result"""
+        with self._lock:
+            if self._admitted >= self.workers + self.max_queue:
+                raise GenerationPoolFull()
+            self._admitted += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            if self.mode == "process":
+                return await loop.run_in_executor(
+                    self._get_executor(), _call_in_process, method, args
+                )
+            return await loop.run_in_executor(
+                self._get_executor(), self._call_in_thread, method, args
+            )
+        finally:
+            with self._lock:
+                self._admitted -= 1
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,49 @@
+from typing import Dict, Iterable, List, Tuple
+
+from ..models.question import Question
+from ..schemas.question import QuestionAnswer
+
+
+def normalize_answer(answer: str) -> str:
+    return answer.lower().strip()
+
+
+def grade_submission(
+    questions: Iterable[Question], answers: Iterable[QuestionAnswer]
+) -> Tuple[int, List[Dict]]:
+    """
+    Grade answers against a quiz's already-loaded questions in one pass.
+
+    Questions are looked up in an id-keyed map, so grading issues no queries
+    of its own; load them with the quiz (selectinload) before calling this.
+    Answers to questions outside the map are skipped. Returns the number of
+    correct answers and the per-answer results stored as the quiz's
+    results_data.
+    """
+    by_id = {question.id: question for question in questions}
+    correct_answers = 0
+    results = []
+
+    for answer in answers:
+        question = by_id.get(answer.question_id)
+        if question is None:
+            continue
+
+        is_correct = normalize_answer(question.correct_answer) == normalize_answer(
+            answer.user_answer
+        )
+        correct_answers += is_correct
+        results.append(
+            {
+                "question_id": question.id,
+                "question_text": question.question_text,
+                "user_answer": answer.user_answer,
+                "correct_answer": question.correct_answer,
+                "is_correct": is_correct,
+                "source_page": question.source_page,
+                "source_context": question.source_context_snippet,
+                "bloom_level": question.bloom_level,
+            }
+        )
+
+    return correct_answers, results
@@ -0,0 +1,380 @@
+import os
+import logging
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.generation_job import GenerationJob
+from .dedup import BankDuplicateFilter
+from .nlp_service import NLPService
+from .quiz_store import add_generated_quiz
+from .result_cache import (
+    content_digest,
+    file_digest,
+    generation_cache_key,
+    get_cached_questions,
+    store_questions,
+)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """The job was reclaimed from this worker; its work must be abandoned"""
+
+
+class JobQueue:
+    """
+    Quiz-generation job queue stored in the application database (no broker).
+
+    Jobs are claimed with a compare-and-set UPDATE (status must still be
+    'queued'), which works the same on SQLite and PostgreSQL. A claimed job
+    is leased to one worker: the worker refreshes heartbeat_at while it runs,
+    and a job whose heartbeat is older than lease_seconds is reclaimed as
+    orphaned (its worker crashed). Failures are retried with exponential
+    backoff until max_attempts is reached.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        lease_seconds: int = 120,
+        retry_backoff_seconds: int = 10,
+    ):
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+    def enqueue(
+        self,
+        db: Session,
+        user_id: int,
+        title: str,
+        description: str,
+        source_type: str,
+        config: Dict,
+        source_path: Optional[str] = None,
+        text_content: Optional[str] = None,
+    ) -> GenerationJob:
+        job = GenerationJob(
+            user_id=user_id,
+            title=title,
+            description=description,
+            source_type=source_type,
+            source_path=source_path,
+            text_content=text_content,
+            config=config,
+            status=QUEUED,
+            max_attempts=settings.job_max_attempts,
+            available_at=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def claim(self, worker_id: str) -> Optional[int]:
+        """Lease the oldest runnable job to worker_id and return its id"""
+        with self.session_factory() as db:
+            while True:
+                now = datetime.utcnow()
+                candidate = (
+                    db.query(GenerationJob.id)
+                    .filter(
+                        GenerationJob.status == QUEUED,
+                        GenerationJob.available_at <= now,
+                    )
+                    .order_by(GenerationJob.id)
+                    .first()
+                )
+                if candidate is None:
+                    return None
+
+                claimed = db.execute(
+                    update(GenerationJob)
+                    .where(
+                        GenerationJob.id == candidate.id,
+                        GenerationJob.status == QUEUED,
+                    )
+                    .values(
+                        status=RUNNING,
+                        locked_by=worker_id,
+                        heartbeat_at=now,
+                        attempts=GenerationJob.attempts + 1,
+                        error=None,
+                    )
+                )
+                db.commit()
+                if claimed.rowcount == 1:
+                    return candidate.id
+                # Another worker won the race for this job; try the next one
+
+    def heartbeat(self, job_id: int, worker_id: str, progress: float) -> bool:
+        """Extend the lease; False means the job was reclaimed from this worker"""
+        with self.session_factory() as db:
+            result = db.execute(
+                update(GenerationJob)
+                .where(
+                    GenerationJob.id == job_id,
+                    GenerationJob.locked_by == worker_id,
+                    GenerationJob.status == RUNNING,
+                )
+                .values(heartbeat_at=datetime.utcnow(), progress=progress)
+            )
+            db.commit()
+            return result.rowcount == 1
+
+    def complete(self, db: Session, job_id: int, worker_id: str, quiz_id: int) -> bool:
+        """
+        Mark the job succeeded and commit db's transaction, which also holds
+        the job's quiz, so the two are written together or not at all.
+
+        If the job is no longer leased to worker_id (it was reclaimed), the
+        whole transaction is rolled back and False is returned; the upload is
+        left for the worker that owns the job now.
+        """
+        result = db.execute(
+            update(GenerationJob)
+            .where(
+                GenerationJob.id == job_id,
+                GenerationJob.locked_by == worker_id,
+                GenerationJob.status == RUNNING,
+            )
+            .values(
+                status=SUCCEEDED,
+                progress=1.0,
+                quiz_id=quiz_id,
+                locked_by=None,
+                error=None,
+            )
+        )
+        if result.rowcount != 1:
+            db.rollback()
+            return False
+        db.commit()
+        self._discard_source(db.get(GenerationJob, job_id))
+        return True
+
+    def fail(self, job_id: int, worker_id: str, error: str):
+        """Requeue with backoff, or mark failed once attempts are used up"""
+        with self.session_factory() as db:
+            job = db.get(GenerationJob, job_id)
+            if job is None or job.locked_by != worker_id:
+                return
+            self._release(job, error)
+            db.commit()
+            if job.status == FAILED:
+                self._discard_source(job)
+
+    def reclaim_orphans(self) -> int:
+        """Release running jobs whose worker stopped sending heartbeats"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        with self.session_factory() as db:
+            orphans = (
+                db.query(GenerationJob)
+                .filter(
+                    GenerationJob.status == RUNNING,
+                    or_(
+                        GenerationJob.heartbeat_at.is_(None),
+                        GenerationJob.heartbeat_at < cutoff,
+                    ),
+                )
+                .all()
+            )
+            for job in orphans:
+                logger.warning(
+                    "Reclaiming orphaned job %s from %s", job.id, job.locked_by
+                )
+                self._release(job, f"Worker {job.locked_by} stopped responding")
+            db.commit()
+            for job in orphans:
+                if job.status == FAILED:
+                    self._discard_source(job)
+            return len(orphans)
+
+    def _release(self, job: GenerationJob, error: str):
+        job.locked_by = None
+        job.error = error
+        if job.attempts >= job.max_attempts:
+            job.status = FAILED
+        else:
+            job.status = QUEUED
+            job.progress = 0.0
+            backoff = self.retry_backoff_seconds * (2 ** (job.attempts - 1))
+            job.available_at = datetime.utcnow() + timedelta(seconds=backoff)
+
+    def _discard_source(self, job: Optional[GenerationJob]):
+        """Stored uploads are only needed until the job reaches a final state"""
+        if job is not None and job.source_path:
+            try:
+                os.unlink(job.source_path)
+            except FileNotFoundError:
+                pass
+
+
+class JobWorker:
+    """
+    Pulls jobs from a JobQueue and runs them with its own NLPService.
+
+    Run it standalone with `python -m app.worker`, or in-process via
+    JOB_WORKERS_IN_PROCESS for small deployments.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 2.0,
+        service_factory: Callable[[], NLPService] = NLPService,
+    ):
+        self.queue = queue
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self.poll_interval = poll_interval
+        self.service_factory = service_factory
+        self._service = None
+
+    @property
+    def service(self) -> NLPService:
+        if self._service is None:
+            self._service = self.service_factory()
+        return self._service
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None):
+        stop_event = stop_event or threading.Event()
+        logger.info("Job worker %s started", self.worker_id)
+        while not stop_event.is_set():
+            try:
+                self.queue.reclaim_orphans()
+                if not self.run_once():
+                    stop_event.wait(self.poll_interval)
+            except Exception:
+                logger.exception("Job worker %s error", self.worker_id)
+                stop_event.wait(self.poll_interval)
+        logger.info("Job worker %s stopped", self.worker_id)
+
+    def run_once(self) -> bool:
+        """Process one job if one is available; returns whether it did"""
+        job_id = self.queue.claim(self.worker_id)
+        if job_id is None:
+            return False
+
+        progress = {"value": 0.0}
+        done = threading.Event()
+        lease_lost = threading.Event()
+
+        def keep_lease():
+            # Heartbeat independently of progress: document analysis can run
+            # longer than the lease without reporting anything
+            interval = max(self.queue.lease_seconds / 3, 1)
+            while not done.wait(interval):
+                if not self.queue.heartbeat(job_id, self.worker_id, progress["value"]):
+                    # Reclaimed by another worker: _process stops at its next check
+                    lease_lost.set()
+                    return
+
+        heartbeat_thread = threading.Thread(target=keep_lease, daemon=True)
+        heartbeat_thread.start()
+        try:
+            quiz_id = self._process(job_id, progress, lease_lost)
+        except LeaseLost:
+            logger.warning("Job %s abandoned: lease lost to another worker", job_id)
+        except Exception as e:
+            logger.warning("Job %s failed: %s", job_id, e)
+            self.queue.fail(job_id, self.worker_id, str(e))
+        else:
+            logger.info("Job %s completed, quiz %s", job_id, quiz_id)
+        finally:
+            done.set()
+            heartbeat_thread.join()
+        return True
+
+    def _process(self, job_id: int, progress: Dict, lease_lost: threading.Event) -> int:
+        def check_lease():
+            if lease_lost.is_set():
+                raise LeaseLost(f"Job {job_id} was reclaimed from {self.worker_id}")
+
+        with self.queue.session_factory() as db:
+            job = db.get(GenerationJob, job_id)
+
+            def on_progress(fraction: float):
+                # Called between pages and questions, so generation stops early
+                check_lease()
+                progress["value"] = round(fraction, 3)
+
+            if job.source_type == "pdf":
+                digest = file_digest(job.source_path)
+            else:
+                digest = content_digest(job.text_content)
+            cache_key = generation_cache_key(digest, job.config)
+            questions_data = get_cached_questions(db, cache_key) if cache_key else None
+
+            if questions_data is None:
+                questions_data = self._generate(job, on_progress)
+                if cache_key:
+                    store_questions(db, cache_key, questions_data)
+
+            check_lease()
+            # The quiz commits together with the job's SUCCEEDED status: a
+            # crash in between can't leave a quiz that a retry duplicates
+            quiz = add_generated_quiz(
+                db, job.user_id, job.title, job.description, questions_data
+            )
+            if not self.queue.complete(db, job_id, self.worker_id, quiz.id):
+                raise LeaseLost(f"Job {job_id} was reclaimed from {self.worker_id}")
+            return quiz.id
+
+    def _generate(self, job: GenerationJob, on_progress) -> List[Dict]:
+        bank_filter = (
+            BankDuplicateFilter(job.user_id)
+            if job.config.get("avoid_bank_duplicates")
+            else None
+        )
+        if job.source_type == "pdf":
+            questions_data = self.service.generate_questions_from_pdf(
+                job.source_path, job.config, on_progress, bank_filter
+            )
+            if questions_data is None:
+                raise ValueError("No text content found in PDF")
+            return questions_data
+        return self.service.generate_questions_from_text(
+            job.text_content, job.config, on_progress, bank_filter
+        )
+
+
+def start_in_process_workers(count: int, queue: JobQueue) -> Callable[[], None]:
+    """Start `count` worker threads; returns a function that stops them"""
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(
+            target=JobWorker(
+                queue, poll_interval=settings.job_poll_interval_seconds
+            ).run_forever,
+            args=(stop_event,),
+            name=f"job-worker-{i}",
+            daemon=True,
+        )
+        for i in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+
+    def stop():
+        stop_event.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    return stop
@@ -575,20 +575,136 @@
 #                 "page_number": page["page_number"],
 #             }
 
-import spacy
 import fitz  # PyMuPDF
-import nltk
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Iterable, Iterator, Tuple, Optional, Union
 
 # ❌ REMOVED: transformers imports to save RAM
 # from transformers import T5ForConditionalGeneration, T5Tokenizer
+import itertools
+import logging
 import random
 import re
 from collections import defaultdict
 
+from ..core.config import settings
+from ..core.memory import MemoryCeiling
+from ..core.metrics import (
+    observe_question_generation,
+    observe_stage,
+    track_in_flight,
+)
+from .dedup import DUPLICATE_THRESHOLD, LSHIndex, default_hasher
+from .distractor_ranker import DistractorRanker
+from .entity_inventory import EntityInventory
+from .candidate_index import (
+    DEFINITION,
+    ENTITY,
+    NEGATABLE,
+    NEGATABLE_PATTERN,
+    NUMERIC,
+    Candidate,
+    CandidateIndex,
+)
+from .parse_cache import ParseCache, normalize_text
+from .qg_backends import build_question_generator
+from .pdf_extraction import effective_workers, iter_page_texts_parallel
+from .text_windows import is_oversized, iter_sentence_windows
+
+logger = logging.getLogger(__name__)
+
+# Named spaCy pipeline profiles, all served from the one loaded model:
+# - full: every component (tagger, parser, lemmatizer, NER)
+# - ner: only the entity recognizer (no sentence boundaries, no POS tags)
+# - sentences: a rule-based sentencizer sharing the model's vocab
+PROFILE_FULL = "full"
+PROFILE_NER = "ner"
+PROFILE_SENTENCES = "sentences"
+
+
+class ChunkAnalysis:
+    """
+    Everything the generators need from one chunk of text, parsed once.
+
+    Build it with NLPService.analyze_chunk() and hand the same object to every
+    generator/helper instead of letting each of them call self.nlp() again.
+    """
+
+    def __init__(self, text: str, doc):
+        self.text = text
+        self.doc = doc
+        # Lean profiles may skip sentence boundaries (ner) or POS tags (sentences)
+        self.sentences = list(doc.sents) if doc.has_annotation("SENT_START") else []
+
+        entities_by_type = defaultdict(list)
+        for ent in doc.ents:
+            entity_text = ent.text.strip()
+            if len(entity_text) > 1 and entity_text not in entities_by_type[ent.label_]:
+                entities_by_type[ent.label_].append(entity_text)
+        # Need at least 2 entities of the same type for them to be useful distractors
+        self.entities_by_type = {
+            label: entities
+            for label, entities in entities_by_type.items()
+            if len(entities) >= 2
+        }
+
+        noun_freq = defaultdict(int)
+        for token in doc:
+            if token.pos_ == "NOUN" and len(token.text) > 2 and token.is_alpha:
+                noun_freq[token.text] += 1
+        self.noun_frequencies = dict(noun_freq)
+
+        self.numeric_tokens = [token for token in doc if token.like_num]
+
+    def high_frequency_nouns(self, limit: int = 10) -> List[str]:
+        return [
+            noun
+            for noun, freq in sorted(
+                self.noun_frequencies.items(), key=lambda x: x[1], reverse=True
+            )[:limit]
+        ]
+
+    def numeric_tokens_in(self, sentence) -> List[str]:
+        """Numbers that fall inside the given sentence span"""
+        return [
+            token.text
+            for token in self.numeric_tokens
+            if sentence.start <= token.i < sentence.end
+        ]
+
+
+class GeneratedQuestions(list):
+    """
+    The question dicts of one generation run. truncated is True when the
+    memory ceiling cut the document short: the questions then depend on the
+    process's memory use at the time, so they must not be memoized.
+    """
+
+    truncated = False
+
 
 class NLPService:
+    # Lightest pipeline profile each generator can work with
+    GENERATOR_PROFILES = {
+        "generate_mcq_question": PROFILE_FULL,  # definitions, entities, nouns
+        "generate_short_answer_question": PROFILE_FULL,  # definitions, entities
+        "generate_true_false_question": PROFILE_SENTENCES,  # sentences, numbers
+    }
+
+    # CandidateIndex categories each generator draws sentences from
+    GENERATOR_CANDIDATES = {
+        "generate_mcq_question": (DEFINITION, ENTITY),
+        "generate_short_answer_question": (DEFINITION, ENTITY),
+        "generate_true_false_question": (NUMERIC, NEGATABLE),
+    }
+
+    # Most frequent same-type entities considered when ranking distractors
+    DISTRACTOR_CANDIDATE_LIMIT = 200
+
     def __init__(self):
+        # Imported here so importing the app doesn't pay for spaCy (~0.6s);
+        # the model itself is loaded from the installed package, never the network
+        import spacy
+
         # Load spaCy model (Lightweight: ~15MB RAM)
         try:
             self.nlp = spacy.load("en_core_web_sm")
@@ -597,95 +713,354 @@ class NLPService:
                 "spaCy model 'en_core_web_sm' not found. Please install it using: python -m spacy download en_core_web_sm"
             )
 
+        self._build_profiles()
+        self.distractor_ranker = DistractorRanker()
+        # Rule-based by default; QG_BACKEND=seq2seq shares one batched model
+        # across every service in the process
+        self.question_generator = build_question_generator()
+
+        self.parse_cache = ParseCache(
+            self.nlp.vocab,
+            namespace=f"{self.nlp.meta.get('name')}-{self.nlp.meta.get('version')}",
+            max_entries=settings.parse_cache_max_entries,
+            cache_dir=settings.parse_cache_dir or None,
+            max_disk_bytes=settings.parse_cache_max_disk_mb * 1024 * 1024,
+        )
+
         # ❌ REMOVED: T5 Model loading (This saves ~400MB RAM)
         # self.t5_model = ...
         # self.t5_tokenizer = ...
 
-        # Download NLTK data
-        try:
-            nltk.data.find("tokenizers/punkt")
-        except LookupError:
-            nltk.download("punkt")
+    def warm_up(self):
+        """Run each pipeline once so the first real request doesn't pay first-call costs"""
+        sample = "Photosynthesis is the process by which plants make food in 1905."
+        for profile in (PROFILE_FULL, PROFILE_NER, PROFILE_SENTENCES):
+            pipeline, disabled = self._pipeline_for(profile)
+            pipeline(sample, disable=disabled)
 
-    def extract_text_from_pdf(self, pdf_path: str) -> List[Dict]:
+    def extract_text_from_pdf(
+        self,
+        pdf_path: str,
+        page_range: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[Dict]:
         """Extract text from PDF with page numbers and context"""
         try:
-            doc = fitz.open(pdf_path)
-            pages_content = []
-
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text = page.get_text()
-
-                if text.strip():  # Only add pages with content
-                    pages_content.append(
-                        {
-                            "page_number": page_num + 1,
-                            "content": text.strip(),
-                            "paragraphs": self._split_into_paragraphs(text),
-                        }
-                    )
-
-            doc.close()
-            return pages_content
+            return list(self.iter_pdf_pages(pdf_path, page_range, max_pages, max_chars))
         except Exception as e:
-            print(f"Error processing PDF: {str(e)}")
+            logger.warning("Error processing PDF: %s", e)
             return []
 
+    @observe_stage("pdf_extraction")
+    def iter_pdf_pages(
+        self,
+        source: Union[str, bytes, bytearray],
+        page_range: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+    ) -> Iterator[Dict]:
+        """
+        Yield pages with text one at a time, in the same shape as extract_text_from_pdf().
+
+        source is a file path, or the PDF bytes themselves for small uploads
+        that never touched disk.
+
+        page_range is 1-based and inclusive, either end may be None. max_pages and
+        max_chars (default: PDF_MAX_PAGES / PDF_MAX_CHARS) stop extraction early;
+        the page that crosses max_chars is truncated.
+
+        Large page ranges are extracted by a pool of PDF_EXTRACT_WORKERS
+        processes (each opening its own fitz document) and merged back in page
+        order; small and in-memory files are read serially in this process.
+        """
+        max_pages = max_pages or settings.pdf_max_pages
+        max_chars = max_chars or settings.pdf_max_chars
+
+        in_memory = not isinstance(source, str)
+        try:
+            if in_memory:
+                doc = fitz.open(stream=source, filetype="pdf")
+            else:
+                doc = fitz.open(source)
+        except Exception as e:
+            logger.warning("Error processing PDF: %s", e)
+            return
+
+        page_texts = None
+        try:
+            first, last = self._resolve_page_range(len(doc), page_range)
+            pages_wanted = min(last - first, max_pages or last - first)
+            workers = effective_workers(settings.pdf_extract_workers)
+
+            if (
+                not in_memory
+                and workers > 1
+                and pages_wanted >= settings.pdf_parallel_min_pages
+            ):
+                page_texts = iter_page_texts_parallel(
+                    source, first, last, workers, settings.pdf_parallel_chunk_pages
+                )
+            else:
+                page_texts = (
+                    (page_num + 1, doc.load_page(page_num).get_text())
+                    for page_num in range(first, last)
+                )
+
+            pages_yielded = 0
+            chars_yielded = 0
+
+            for page_number, text in page_texts:
+                if max_pages and pages_yielded >= max_pages:
+                    break
+                if max_chars and chars_yielded >= max_chars:
+                    break
+
+                if not text.strip():  # Only yield pages with content
+                    continue
+                if max_chars:
+                    text = text[: max_chars - chars_yielded]
+
+                pages_yielded += 1
+                chars_yielded += len(text)
+                yield {
+                    "page_number": page_number,
+                    "content": text.strip(),
+                    "paragraphs": self._split_into_paragraphs(text),
+                }
+        finally:
+            # Stops the parallel reader (and its queued work) if we broke out early
+            if page_texts is not None:
+                page_texts.close()
+            doc.close()
+
+    def _resolve_page_range(
+        self,
+        page_count: int,
+        page_range: Optional[Tuple[Optional[int], Optional[int]]],
+    ) -> Tuple[int, int]:
+        """Turn a 1-based inclusive (start, end) into a clamped 0-based range()"""
+        start, end = page_range or (None, None)
+        first = max((start or 1) - 1, 0)
+        last = min(end or page_count, page_count)
+        return first, max(first, last)
+
     def _split_into_paragraphs(self, text: str) -> List[str]:
         paragraphs = re.split(r"\n\s*\n|\n{2,}", text)
         return [p.strip() for p in paragraphs if len(p.strip()) > 50]
 
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
-        doc = self.nlp(text)
-        entities_by_type = defaultdict(set)
+    def _build_profiles(self):
+        """Work out which components each lean profile switches off"""
+        import spacy
 
-        for ent in doc.ents:
-            entity_text = ent.text.strip()
-            if len(entity_text) > 1:
-                entities_by_type[ent.label_].add(entity_text)
+        keep_for_ner = {
+            name
+            for name in self.nlp.pipe_names
+            if "doc.ents" in self.nlp.get_pipe_meta(name).assigns
+        }
+        if "tok2vec" in self.nlp.pipe_names:
+            # Only keep the shared tok2vec if the entity recognizer listens to it
+            listeners = self.nlp.get_pipe("tok2vec").listening_components
+            if keep_for_ner.intersection(listeners):
+                keep_for_ner.add("tok2vec")
+
+        self._profile_disabled = {
+            PROFILE_FULL: [],
+            PROFILE_NER: [
+                name for name in self.nlp.pipe_names if name not in keep_for_ner
+            ],
+        }
 
-        result = {}
-        for entity_type, entities in entities_by_type.items():
-            entity_list = list(entities)
-            if len(entity_list) >= 2:
-                result[entity_type] = entity_list
+        # Sentence splitting doesn't need the statistical parser at all
+        self._sentencizer = spacy.blank(self.nlp.lang, vocab=self.nlp.vocab)
+        self._sentencizer.add_pipe("sentencizer")
 
-        return result
+    def _pipeline_for(self, profile: str):
+        if profile == PROFILE_SENTENCES:
+            return self._sentencizer, []
+        if profile not in self._profile_disabled:
+            raise ValueError(f"Unknown spaCy pipeline profile: {profile}")
+        return self.nlp, self._profile_disabled[profile]
 
-    # ✅ NEW: Lightweight Question Generator (No AI Model)
-    def generate_question_answer(self, context: str) -> Optional[Tuple[str, str]]:
+    @observe_stage("spacy_parse")
+    def parse(self, text: str, profile: str = PROFILE_FULL, cache: bool = True):
         """
-        Generates a question using logic/patterns instead of a heavy AI model.
-        This runs instantly and uses almost 0 RAM.
+        self.nlp() behind the parse cache; the Doc is built from normalized text.
+        With cache=False the Doc is neither looked up nor kept.
         """
-        doc = self.nlp(context)
-
-        # Strategy 1: Find a definition (sentences with "is a", "means", "refers to")
-        for sent in doc.sents:
-            text = sent.text.strip()
-            if " is " in text and len(text) < 150:
-                parts = text.split(" is ", 1)
-                if len(parts) == 2:
-                    # Ex: "Python is a programming language."
-                    # Q: What is Python? A: a programming language
-                    subject = parts[0].strip()
-                    answer = parts[1].strip(" .")
-                    question = f"What is {subject}?"
-                    return question, answer
-
-        # Strategy 2: Fill in the blank with Named Entities
-        # Find a sentence with a clear entity (Person, Organization, Date)
-        for ent in doc.ents:
-            if ent.label_ in ["PERSON", "ORG", "GPE", "DATE"]:
-                sentence = ent.sent.text.strip()
-                if len(sentence) < 200:
-                    answer = ent.text
-                    question = sentence.replace(answer, "_______")
-                    question = f"Fill in the blank: {question}"
-                    return question, answer
+        text = normalize_text(text)
+        if not cache:
+            pipeline, disabled = self._pipeline_for(profile)
+            return pipeline(text, disable=disabled)
+
+        key = self.parse_cache.key_for(text, profile)
+        doc = self.parse_cache.get(key)
+        if doc is None:
+            pipeline, disabled = self._pipeline_for(profile)
+            doc = pipeline(text, disable=disabled)
+            self.parse_cache.put(key, doc)
+        return doc
+
+    @observe_stage("spacy_parse")
+    def parse_many(
+        self,
+        texts: List[str],
+        profile: str = PROFILE_FULL,
+        batch_size: Optional[int] = None,
+        n_process: Optional[int] = None,
+    ) -> List:
+        """Batched parse(): cached texts are reused, only the misses go through nlp.pipe()"""
+        texts = [normalize_text(text) for text in texts]
+        keys = [self.parse_cache.key_for(text, profile) for text in texts]
+        docs = [self.parse_cache.get(key) for key in keys]
+
+        misses = [i for i, doc in enumerate(docs) if doc is None]
+        if misses:
+            pipeline, disabled = self._pipeline_for(profile)
+            parsed = pipeline.pipe(
+                (texts[i] for i in misses),
+                disable=disabled,
+                batch_size=batch_size or settings.nlp_batch_size,
+                n_process=n_process or settings.nlp_n_process,
+            )
+            for i, doc in zip(misses, parsed):
+                self.parse_cache.put(keys[i], doc)
+                docs[i] = doc
 
-        return None
+        return docs
+
+    def analyze_chunk(self, text: str, profile: str = PROFILE_FULL) -> ChunkAnalysis:
+        """Parse a chunk once; pass the result to every generator that needs it"""
+        doc = self.parse(text, profile)
+        return ChunkAnalysis(doc.text, doc)
+
+    def iter_document_analysis(
+        self,
+        pages_content: Iterable[Dict],
+        profile: str = PROFILE_FULL,
+        batch_size: Optional[int] = None,
+        n_process: Optional[int] = None,
+        memory_ceiling: Optional[MemoryCeiling] = None,
+    ) -> Iterator[Dict]:
+        """
+        Parse the chunks of a document with batched nlp.pipe() calls as pages stream in.
+
+        Chunks are the page paragraphs (or the first 500 characters of the
+        page when it has none). Pages are
+        pulled a window at a time, so a lazy page iterator is never read further
+        ahead than the batch currently being parsed.
+
+        A chunk over NLP_WINDOW_MAX_TOKENS is instead cut into sentence windows
+        (see services/text_windows.py) that are parsed one at a time and not
+        cached; their chunks are marked "windowed" so callers can drop each
+        window's Doc before the next one is built.
+
+        memory_ceiling, if given, stops reading the document once it is exceeded.
+        """
+        batch_size = batch_size or settings.nlp_batch_size
+        n_process = n_process or settings.nlp_n_process
+        max_tokens = settings.nlp_window_max_tokens
+        chunks = (
+            (text, page["page_number"])
+            for page in pages_content
+            for text in (page["paragraphs"] or [page["content"][:500]])
+        )
+
+        pending = []
+        for text, page_number in chunks:
+            if not is_oversized(text, max_tokens):
+                pending.append((text, page_number))
+                if len(pending) < batch_size * n_process * 4:
+                    continue
+                yield from self._analyze_batch(pending, profile, batch_size, n_process)
+                pending = []
+            else:
+                # Keep document order: parse what is pending before the windows
+                yield from self._analyze_batch(pending, profile, batch_size, n_process)
+                pending = []
+                for window in iter_sentence_windows(text, max_tokens):
+                    doc = self.parse(window, profile, cache=False)
+                    yield {
+                        "content": doc.text,
+                        "page_number": page_number,
+                        "analysis": ChunkAnalysis(doc.text, doc),
+                        "windowed": True,
+                    }
+                    del doc
+                    if memory_ceiling is not None and memory_ceiling.exceeded():
+                        break
+
+            if memory_ceiling is not None and memory_ceiling.exceeded():
+                logger.warning(
+                    "Memory ceiling reached (+%dMB); skipping the rest of the document",
+                    memory_ceiling.growth() // 2**20,
+                )
+                pending = []
+                break
+
+        yield from self._analyze_batch(pending, profile, batch_size, n_process)
+        logger.debug("Parse cache: %s", self.parse_cache.stats())
+
+    def _analyze_batch(
+        self,
+        chunks: List[Tuple[str, int]],
+        profile: str,
+        batch_size: int,
+        n_process: int,
+    ) -> Iterator[Dict]:
+        if not chunks:
+            return
+        docs = self.parse_many(
+            [text for text, _ in chunks],
+            profile=profile,
+            batch_size=batch_size,
+            n_process=n_process,
+        )
+        for doc, (_, page_number) in zip(docs, chunks):
+            yield {
+                "content": doc.text,
+                "page_number": page_number,
+                "analysis": ChunkAnalysis(doc.text, doc),
+                "windowed": False,
+            }
+
+    def _detach_candidate(self, candidate: Candidate) -> Candidate:
+        """
+        Copy of candidate backed by a Doc of its own sentence only, so the
+        index keeps a few sentences of a window rather than the whole window
+        """
+        doc = candidate.sentence.as_doc()
+        entity = None
+        if candidate.entity is not None:
+            offset = candidate.entity.start - candidate.sentence.start
+            entity = next((ent for ent in doc.ents if ent.start == offset), None)
+        return Candidate(
+            candidate.kind,
+            doc[:],
+            candidate.page_number,
+            ChunkAnalysis(doc.text, doc),
+            entity,
+        )
+
+    def extract_entities(
+        self, text: str, analysis: Optional[ChunkAnalysis] = None
+    ) -> Dict[str, List[str]]:
+        analysis = analysis or self.analyze_chunk(text, PROFILE_NER)
+        return analysis.entities_by_type
+
+    def generate_question_answer(
+        self, context: str, analysis: Optional[ChunkAnalysis] = None
+    ) -> Optional[Tuple[str, str]]:
+        """
+        (question, answer) from the configured backend (settings.qg_backend):
+        definition / fill-in-the-blank patterns by default, or a seq2seq model.
+        """
+        analysis = analysis or self.analyze_chunk(context)
+        return self.question_generator.generate(analysis)
+
+    def _question_answer_for(self, candidate: Candidate) -> Optional[Tuple[str, str]]:
+        """generate_question_answer() for one indexed sentence"""
+        return self.question_generator.generate(candidate.analysis, candidate)
 
     def verify_answer_in_text(self, answer: str, text: str) -> bool:
         clean_answer = answer.strip().lower()
@@ -707,22 +1082,46 @@ class NLPService:
         entity_type: Optional[str],
         entities_by_type: Dict[str, List[str]],
         text: str,
+        analysis: Optional[ChunkAnalysis] = None,
+        inventory: Optional[EntityInventory] = None,
     ) -> List[str]:
+        """
+        Three wrong options for answer. With a document EntityInventory the
+        same-type entities and fallback nouns come from the whole document
+        rather than just this chunk. Each tier is ranked by similarity to the
+        answer (see DistractorRanker); near-duplicates of it are skipped.
+        """
         distractors = []
         answer_clean = answer.strip().lower()
 
         # 1. Try entities of same type
-        if entity_type and entity_type in entities_by_type:
-            same_type = [
-                e for e in entities_by_type[entity_type] if e.lower() != answer_clean
-            ]
-            distractors.extend(same_type)
+        same_type = []
+        if inventory is not None and entity_type:
+            same_type = inventory.entities(entity_type)
+        elif entity_type and entity_type in entities_by_type:
+            same_type = entities_by_type[entity_type]
+        same_type = [e for e in same_type if e.lower() != answer_clean]
+        distractors.extend(
+            self.distractor_ranker.rank(
+                answer, same_type[: self.DISTRACTOR_CANDIDATE_LIMIT], k=3
+            )
+        )
 
         # 2. Fallback: High freq nouns
         if len(distractors) < 3:
-            nouns = self._extract_high_frequency_nouns(text)
-            available = [n for n in nouns if n.lower() != answer_clean]
-            distractors.extend(available)
+            if inventory is not None:
+                nouns = inventory.common_nouns()
+            else:
+                nouns = self._extract_high_frequency_nouns(text, analysis)
+            chosen = {d.lower() for d in distractors}
+            available = [
+                n
+                for n in nouns
+                if n.lower() != answer_clean and n.lower() not in chosen
+            ]
+            distractors.extend(
+                self.distractor_ranker.rank(answer, available, k=3 - len(distractors))
+            )
 
         # 3. Final Fallback: Generic
         if len(distractors) < 3:
@@ -732,44 +1131,69 @@ class NLPService:
                 "Not applicable",
                 "Various",
             ]
-            distractors.extend(generics)
+            distractors.extend(generics[: 3 - len(distractors)])
 
-        random.shuffle(distractors)
         return distractors[:3]
 
-    def _extract_high_frequency_nouns(self, text: str) -> List[str]:
-        doc = self.nlp(text)
-        noun_freq = defaultdict(int)
-        for token in doc:
-            if token.pos_ == "NOUN" and len(token.text) > 2 and token.is_alpha:
-                noun_freq[token.text] += 1
-        return [
-            noun
-            for noun, freq in sorted(
-                noun_freq.items(), key=lambda x: x[1], reverse=True
-            )[:10]
-        ]
+    def _extract_high_frequency_nouns(
+        self, text: str, analysis: Optional[ChunkAnalysis] = None
+    ) -> List[str]:
+        analysis = analysis or self.analyze_chunk(text)
+        return analysis.high_frequency_nouns()
 
-    def generate_mcq_question(self, context: str, page_num: int) -> Optional[Dict]:
-        all_entities = self.extract_entities(context)
+    @observe_question_generation("MCQ")
+    def generate_mcq_question(
+        self,
+        context: str,
+        page_num: int,
+        analysis: Optional[ChunkAnalysis] = None,
+        candidate: Optional[Candidate] = None,
+        inventory: Optional[EntityInventory] = None,
+        rng: Optional[random.Random] = None,
+    ) -> Optional[Dict]:
+        """
+        candidate, if given, is the indexed sentence to build the question from;
+        inventory, if given, supplies document-wide distractors; rng (default:
+        the random module) shuffles the options.
+        """
+        rng = rng or random
+        analysis = analysis or self.analyze_chunk(
+            context, self.GENERATOR_PROFILES["generate_mcq_question"]
+        )
+        context = analysis.text
+        all_entities = self.extract_entities(context, analysis)
 
         # Logic-based generation
-        qa_result = self.generate_question_answer(context)
+        if candidate is not None:
+            qa_result = self._question_answer_for(candidate)
+        else:
+            qa_result = self.generate_question_answer(context, analysis)
         if not qa_result:
             return None
 
         question, answer = qa_result
 
         # Get distractors
-        entity_type = self.get_entity_type(answer, all_entities)
-        distractors = self.get_distractors(answer, entity_type, all_entities, context)
+        if (
+            candidate is not None
+            and candidate.entity is not None
+            and candidate.entity.text == answer
+        ):
+            entity_type = candidate.entity.label_
+        elif inventory is not None:
+            entity_type = inventory.label_of(answer)
+        else:
+            entity_type = self.get_entity_type(answer, all_entities)
+        distractors = self.get_distractors(
+            answer, entity_type, all_entities, context, analysis, inventory
+        )
 
         # Pad distractors if needed
         while len(distractors) < 3:
             distractors.append("Incorrect Option " + str(len(distractors) + 1))
 
         options = [answer] + distractors
-        random.shuffle(options)
+        rng.shuffle(options)
 
         return {
             "question_text": question,
@@ -782,6 +1206,42 @@ class NLPService:
             "difficulty_level": "Medium",
         }
 
+    @observe_question_generation("Short Answer")
+    def generate_short_answer_question(
+        self,
+        context: str,
+        page_num: int,
+        analysis: Optional[ChunkAnalysis] = None,
+        candidate: Optional[Candidate] = None,
+    ) -> Optional[Dict]:
+        """candidate, if given, is the indexed sentence to build the question from"""
+        analysis = analysis or self.analyze_chunk(
+            context, self.GENERATOR_PROFILES["generate_short_answer_question"]
+        )
+        context = analysis.text
+
+        if candidate is not None:
+            qa_result = self._question_answer_for(candidate)
+        else:
+            qa_result = self.generate_question_answer(context, analysis)
+        if not qa_result:
+            return None
+
+        question, answer = qa_result
+        if not self.verify_answer_in_text(answer, context):
+            return None
+
+        return {
+            "question_text": question,
+            "question_type": "Short Answer",
+            "options": None,
+            "correct_answer": answer,
+            "bloom_level": self._determine_bloom_level(question),
+            "source_page": page_num,
+            "source_context_snippet": context[:100] + "...",
+            "difficulty_level": self._determine_difficulty(context),
+        }
+
     # (Keep these methods as they were, they are safe)
     def _determine_bloom_level(self, question: str) -> str:
         return "Remember"
@@ -791,31 +1251,58 @@ class NLPService:
     ) -> str:
         return "Medium"
 
-    def _modify_sentence_for_false(self, sentence: str) -> str:
-        doc = self.nlp(sentence)
-        for token in doc:
-            if token.like_num:
-                return sentence.replace(token.text, "99999")  # Simple change
-        if " is " in sentence:
-            return sentence.replace(" is ", " is not ")
+    def _modify_sentence_for_false(
+        self, sentence: str, numeric_tokens: Optional[List[str]] = None
+    ) -> str:
+        if numeric_tokens is None:
+            numeric_tokens = [
+                token.text
+                for token in self.parse(sentence, PROFILE_SENTENCES)
+                if token.like_num
+            ]
+        for number in numeric_tokens:
+            return sentence.replace(number, "99999")  # Simple change
+        copula = NEGATABLE_PATTERN.search(sentence)
+        if copula:
+            verb = copula.group(1)
+            return sentence.replace(f" {verb} ", f" {verb} not ", 1)
         return "False: " + sentence
 
+    @observe_question_generation("True/False")
     def generate_true_false_question(
-        self, context: str, page_num: int
+        self,
+        context: str,
+        page_num: int,
+        analysis: Optional[ChunkAnalysis] = None,
+        candidate: Optional[Candidate] = None,
+        rng: Optional[random.Random] = None,
     ) -> Optional[Dict]:
-        # Keep your existing logic or simplify
-        sentences = [s.text for s in self.nlp(context).sents if len(s.text) > 20]
-        if not sentences:
-            return None
-
-        fact = random.choice(sentences)
-        is_true = random.choice([True, False])
+        """
+        candidate, if given, is the indexed sentence to build the question from;
+        rng (default: the random module) picks a true or a false statement.
+        """
+        rng = rng or random
+        analysis = analysis or self.analyze_chunk(
+            context, self.GENERATOR_PROFILES["generate_true_false_question"]
+        )
+        context = analysis.text
+        if candidate is not None:
+            fact = candidate.sentence
+        else:
+            sentences = [s for s in analysis.sentences if len(s.text) > 20]
+            if not sentences:
+                return None
+            fact = rng.choice(sentences)
+        is_true = rng.choice([True, False])
 
         if is_true:
-            q_text = f"True or False: {fact}"
+            q_text = f"True or False: {fact.text}"
             ans = "True"
         else:
-            q_text = f"True or False: {self._modify_sentence_for_false(fact)}"
+            modified = self._modify_sentence_for_false(
+                fact.text, analysis.numeric_tokens_in(fact)
+            )
+            q_text = f"True or False: {modified}"
             ans = "False"
 
         return {
@@ -823,14 +1310,226 @@ class NLPService:
             "question_type": "True/False",
             "options": ["True", "False"],
             "correct_answer": ans,
+            "bloom_level": "Remember",
             "source_page": page_num,
+            "source_context_snippet": context[:100] + "...",
         }
 
     def generate_questions_from_text(
-        self, text_content: str, config: Dict
+        self,
+        text_content: str,
+        config: Dict,
+        on_progress: Optional[Callable[[float], None]] = None,
+        is_duplicate: Optional[Callable[[str], bool]] = None,
+    ) -> List[Dict]:
+        pages_content = [
+            {
+                "page_number": 1,
+                "content": text_content,
+                "paragraphs": self._split_into_paragraphs(text_content),
+            }
+        ]
+        return self.generate_questions_from_pages(
+            pages_content, config, on_progress, is_duplicate
+        )
+
+    def generate_questions_from_pdf(
+        self,
+        source: Union[str, bytes, bytearray],
+        config: Dict,
+        on_progress: Optional[Callable[[float], None]] = None,
+        is_duplicate: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Stream a PDF through generate_questions_from_pages().
+
+        Returns None when the PDF has no extractable text in the requested range.
+        """
+        pages = self.iter_pdf_pages(
+            source, page_range=(config.get("start_page"), config.get("end_page"))
+        )
+        first_page = next(pages, None)
+        if first_page is None:
+            return None
+
+        return self.generate_questions_from_pages(
+            itertools.chain([first_page], pages), config, on_progress, is_duplicate
+        )
+
+    @track_in_flight
+    def generate_questions_from_pages(
+        self,
+        pages_content: Iterable[Dict],
+        config: Dict,
+        on_progress: Optional[Callable[[float], None]] = None,
+        is_duplicate: Optional[Callable[[str], bool]] = None,
+    ) -> List[Dict]:
+        """
+        Analyze the document, then run every generator on it.
+
+        pages_content may be a lazy iterator (see iter_pdf_pages()). Sentences
+        are classified into a CandidateIndex while pages are still being read;
+        its per-category reservoirs bound memory regardless of document size.
+        Each generator then draws its sentences from the index without
+        replacement, so a short quiz only means the document ran out of
+        suitable sentences.
+
+        on_progress, if given, is called with the completed fraction (0.0-1.0):
+        0.5 once the document is analyzed, then per question attempted.
+
+        Questions that near-duplicate one already in this quiz (MinHash LSH,
+        see services/dedup.py) are rejected and the next candidate is drawn;
+        is_duplicate(question_text), if given, can reject more (e.g. questions
+        already in the user's bank). An is_duplicate with a close() method
+        (BankDuplicateFilter holds a database connection for the run) is
+        closed when generation ends, in whichever process ran it.
+        """
+        try:
+            return self._generate_questions_from_pages(
+                pages_content, config, on_progress, is_duplicate
+            )
+        finally:
+            close = getattr(is_duplicate, "close", None)
+            if close is not None:
+                close()
+
+    def _generate_questions_from_pages(
+        self,
+        pages_content: Iterable[Dict],
+        config: Dict,
+        on_progress: Optional[Callable[[float], None]],
+        is_duplicate: Optional[Callable[[str], bool]],
     ) -> List[Dict]:
-        # Simple wrapper to call extractors
-        questions = []
-        # Mock logic to call generate_mcq_question loop
-        # (You can copy your original loop here, it will work fine now that generate_mcq is fixed)
+        inventory = EntityInventory()
+        # Per-request RNG: a seed makes the quiz reproducible, and concurrent
+        # generations never share (or reseed) the global random state
+        rng = random.Random(config.get("seed"))
+        # (label, count, generator, extra keyword arguments)
+        generators = [
+            (
+                "MCQ",
+                config.get("mcq_count", 0),
+                self.generate_mcq_question,
+                {"inventory": inventory, "rng": rng},
+            ),
+            (
+                "Short Answer",
+                config.get("short_answer_count", 0),
+                self.generate_short_answer_question,
+                {},
+            ),
+            (
+                "True/False",
+                config.get("true_false_count", 0),
+                self.generate_true_false_question,
+                {"rng": rng},
+            ),
+        ]
+
+        # Parse with the lightest profile that still serves every requested generator
+        profiles = {
+            self.GENERATOR_PROFILES[generate.__name__]
+            for _, count, generate, _ in generators
+            if count > 0
+        }
+        profile = profiles.pop() if len(profiles) == 1 else PROFILE_FULL
+
+        requested = sum(count for _, count, _, _ in generators)
+        if requested <= 0:
+            return []
+
+        index = CandidateIndex(
+            max_per_kind=max(settings.generation_sample_pool_size, 2 * requested),
+            rng=rng,
+        )
+        chunks_seen = 0
+        memory_ceiling = MemoryCeiling(settings.generation_memory_ceiling_mb)
+        for chunk in self.iter_document_analysis(
+            pages_content, profile=profile, memory_ceiling=memory_ceiling
+        ):
+            chunks_seen += 1
+            index.add_chunk(
+                chunk["analysis"],
+                chunk["page_number"],
+                detach=self._detach_candidate if chunk["windowed"] else None,
+            )
+            inventory.add_chunk(chunk["analysis"], chunk["page_number"])
+            # Release a window's Doc before the next one is parsed
+            del chunk
+
+        logger.debug(
+            "Indexed %d sentences from %d chunks (%s pipeline): %s, "
+            "%d distinct entities",
+            index.sentences_indexed,
+            chunks_seen,
+            profile,
+            index.counts(),
+            len(inventory),
+        )
+        if on_progress:
+            on_progress(0.5)
+
+        questions = GeneratedQuestions()
+        questions.truncated = memory_ceiling.reached
+        seen_questions = LSHIndex(default_hasher, DUPLICATE_THRESHOLD)
+        rejected_duplicates = 0
+        attempted = 0
+        for label, count, generate, extra in generators:
+            logger.debug("Generating %d %s questions", count, label)
+            kinds = self.GENERATOR_CANDIDATES[generate.__name__]
+            for i in range(count):
+                if on_progress:
+                    on_progress(0.5 + 0.5 * attempted / requested)
+                attempted += 1
+                question_data = None
+                # Each candidate is used once; a sentence that still fails
+                # costs one extra draw, never an open-ended retry loop
+                while question_data is None:
+                    candidate = index.take(kinds)
+                    if candidate is None:
+                        break
+                    try:
+                        question_data = generate(
+                            candidate.analysis.text,
+                            candidate.page_number,
+                            candidate.analysis,
+                            candidate,
+                            **extra,
+                        )
+                    except Exception as e:
+                        logger.warning("Error generating %s %d: %s", label, i + 1, e)
+
+                    if question_data and not self._is_new_question(
+                        question_data, seen_questions, is_duplicate
+                    ):
+                        rejected_duplicates += 1
+                        question_data = None
+
+                if question_data:
+                    questions.append(question_data)
+                else:
+                    logger.info("No candidate sentences left for %s %d", label, i + 1)
+
+        logger.info(
+            "Generated %d of %d questions (%d near-duplicates rejected)",
+            len(questions),
+            requested,
+            rejected_duplicates,
+        )
         return questions
+
+    def _is_new_question(
+        self,
+        question_data: Dict,
+        seen_questions: LSHIndex,
+        is_duplicate: Optional[Callable[[str], bool]],
+    ) -> bool:
+        """Check a question against this quiz, then the caller's filter; index it if new"""
+        text = question_data["question_text"]
+        signature = seen_questions.hasher.signature(text)
+        if seen_questions.query(signature):
+            return False
+        if is_duplicate is not None and is_duplicate(text):
+            return False
+        seen_questions.add(len(seen_questions), signature)
+        return True
@@ -0,0 +1,185 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so re-extracted copies of a paragraph hash the same"""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class ParseCache:
+    """
+    Content-addressed cache of parsed spaCy Docs.
+
+    Two tiers:
+    - memory: a bounded LRU of Doc objects (max_entries)
+    - disk: one serialized DocBin per key under cache_dir, evicted least
+      recently used first once the directory grows past max_disk_bytes
+
+    Keys are a SHA-256 of a namespace (model name/version, so an upgraded
+    model never reads stale parses) plus the normalized text.
+    """
+
+    def __init__(
+        self,
+        vocab,
+        namespace: str = "",
+        max_entries: int = 2048,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.vocab = vocab
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Doc]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._disk_bytes = sum(
+                os.path.getsize(path) for path, _ in self._iter_disk_entries()
+            )
+
+    def key_for(self, text: str, variant: str = "") -> str:
+        """variant separates parses of the same text by different pipeline profiles"""
+        digest = hashlib.sha256()
+        digest.update(self.namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(variant.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional["Doc"]:
+        with self._lock:
+            doc = self._memory.get(key)
+            if doc is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return doc
+
+        doc = self._read_disk(key)
+        if doc is not None:
+            self._remember(key, doc)
+            with self._lock:
+                self.disk_hits += 1
+            return doc
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, doc: "Doc"):
+        self._remember(key, doc)
+        self._write_disk(key, doc)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "hits": hits,
+                "misses": self.misses,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "memory_entries": len(self._memory),
+                "memory_evictions": self.memory_evictions,
+                "disk_bytes": self._disk_bytes,
+                "disk_evictions": self.disk_evictions,
+            }
+
+    def _remember(self, key: str, doc: "Doc"):
+        with self._lock:
+            self._memory[key] = doc
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.memory_evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.spacy")
+
+    def _iter_disk_entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".spacy"):
+                    path = os.path.join(root, name)
+                    try:
+                        yield path, os.path.getmtime(path)
+                    except OSError:
+                        continue
+
+    def _read_disk(self, key: str) -> Optional["Doc"]:
+        if not self.cache_dir:
+            return None
+        from spacy.tokens import DocBin
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Touch so size-based eviction treats this entry as recently used
+            os.utime(path)
+            return next(DocBin().from_bytes(data).get_docs(self.vocab))
+        except (OSError, ValueError, StopIteration):
+            return None
+
+    def _write_disk(self, key: str, doc: "Doc"):
+        if not self.cache_dir:
+            return
+        from spacy.tokens import DocBin
+
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        data = DocBin(docs=[doc], store_user_data=False).to_bytes()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Parse cache write failed: %s", e)
+            return
+
+        with self._lock:
+            self._disk_bytes += len(data)
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Drop least recently used blobs until the store is back under 90% of budget"""
+        target = int(self.max_disk_bytes * 0.9)
+        entries = sorted(self._iter_disk_entries(), key=lambda entry: entry[1])
+        with self._lock:
+            for path, _ in entries:
+                if self._disk_bytes <= target:
+                    break
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._disk_bytes -= size
+                self.disk_evictions += 1
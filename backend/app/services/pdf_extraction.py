@@ -0,0 +1,78 @@
+"""
+PDF page-text extraction that can fan out across worker processes.
+
+Kept separate from nlp_service so spawned workers only import PyMuPDF,
+not spaCy and the models.
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def extract_page_texts(pdf_path: str, first: int, last: int) -> List[Tuple[int, str]]:
+    """Worker entry point: open a private fitz document and read pages [first, last)"""
+    doc = fitz.open(pdf_path)
+    try:
+        return [(n + 1, doc.load_page(n).get_text()) for n in range(first, last)]
+    finally:
+        doc.close()
+
+
+def effective_workers(workers: int) -> int:
+    """Never run more extraction processes than there are cores"""
+    return max(1, min(workers, os.cpu_count() or 1))
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """One long-lived pool per process so requests don't pay worker start-up"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: forking a threaded server process is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def iter_page_texts_parallel(
+    pdf_path: str, first: int, last: int, workers: int, chunk_pages: int
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page_number, text) for pages [first, last) in page order.
+
+    The range is split into chunk_pages-sized slices; at most two slices per
+    worker are in flight, so extraction runs ahead of the consumer without
+    buffering the whole document.
+    """
+    pool = _get_pool(workers)
+    slices = (
+        (start, min(start + chunk_pages, last))
+        for start in range(first, last, chunk_pages)
+    )
+    in_flight = deque()
+    try:
+        for start, stop in slices:
+            in_flight.append(pool.submit(extract_page_texts, pdf_path, start, stop))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+    finally:
+        # Consumer stopped early (page/char cap): drop work that hasn't started
+        for future in in_flight:
+            future.cancel()
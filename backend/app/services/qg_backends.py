@@ -0,0 +1,338 @@
+"""
+Question/answer generation backends behind NLPService.generate_question_answer().
+
+- RuleBasedGenerator: definition ("X is Y") and entity fill-in-the-blank
+  patterns; no model, effectively free
+- Seq2SeqGenerator: a seq2seq model (e.g. Flan-T5) prompted for a question,
+  then for its answer. Prompts from all concurrent requests in the process
+  go through one MicroBatchScheduler, so the model runs one batched
+  forward pass per window instead of one generate() call per prompt.
+
+Select with QG_BACKEND=rules|seq2seq. The seq2seq backend needs the optional
+requirements-ml.txt stack and a model already on disk (QG_MODEL_PATH); it
+never downloads anything.
+"""
+
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from ..core.config import settings
+from .candidate_index import DEFINITION, ENTITY, QA_ENTITY_LABELS, Candidate
+
+
+class RuleBasedGenerator:
+    name = "rules"
+
+    def generate(
+        self, analysis, candidate: Optional[Candidate] = None
+    ) -> Optional[Tuple[str, str]]:
+        """(question, answer) for an indexed sentence, or the first match in the chunk"""
+        if candidate is not None:
+            if candidate.kind == DEFINITION:
+                return self.definition_question(candidate.sentence)
+            if candidate.kind == ENTITY:
+                return self.fill_in_blank_question(candidate.sentence, candidate.entity)
+            return None
+
+        # Strategy 1: Find a definition (sentences with "is a", "means", "refers to")
+        for sent in analysis.sentences:
+            qa_result = self.definition_question(sent)
+            if qa_result:
+                return qa_result
+
+        # Strategy 2: Fill in the blank with Named Entities
+        # Find a sentence with a clear entity (Person, Organization, Date)
+        for ent in analysis.doc.ents:
+            if ent.label_ in QA_ENTITY_LABELS:
+                qa_result = self.fill_in_blank_question(ent.sent, ent)
+                if qa_result:
+                    return qa_result
+
+        return None
+
+    def definition_question(self, sentence) -> Optional[Tuple[str, str]]:
+        text = sentence.text.strip()
+        if " is " in text and len(text) < 150:
+            parts = text.split(" is ", 1)
+            if len(parts) == 2:
+                # Ex: "Python is a programming language."
+                # Q: What is Python? A: a programming language
+                subject = parts[0].strip()
+                answer = parts[1].strip(" .")
+                if subject and answer:
+                    question = f"What is {subject}?"
+                    return question, answer
+        return None
+
+    def fill_in_blank_question(self, sentence, ent) -> Optional[Tuple[str, str]]:
+        text = sentence.text.strip()
+        if len(text) < 200:
+            answer = ent.text
+            question = text.replace(answer, "_______")
+            question = f"Fill in the blank: {question}"
+            return question, answer
+        return None
+
+
+# Every scheduler in the process, so a forked child can reset them all
+_schedulers: "weakref.WeakSet[MicroBatchScheduler]" = weakref.WeakSet()
+
+
+class MicroBatchScheduler:
+    """
+    Collects prompts from any number of threads into micro-batches.
+
+    A single background thread takes the first waiting prompt, keeps
+    collecting until max_batch_size prompts are waiting or max_wait_ms has
+    passed since the first one, then runs them through one padded
+    model.generate() call and resolves each caller's Future. Decoding is
+    greedy, so the same prompt always gives the same text.
+
+    A forked child (a gunicorn worker of a preloading master) inherits the
+    scheduler but not its thread: the child gets a fresh queue and starts
+    its own thread on its first prompt, still sharing the model's pages.
+
+    model and tokenizer are any Hugging Face-style seq2seq pair (a tiny
+    randomly initialized one works for tests).
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10,
+        max_input_tokens: int = 512,
+        max_new_tokens: int = 48,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.max_input_tokens = max_input_tokens
+        self.max_new_tokens = max_new_tokens
+
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._closed = False
+        self.batches_run = 0
+        self.prompts_run = 0
+
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start()
+        _schedulers.add(self)
+
+    def _start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="qg-micro-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def _reset_after_fork(self):
+        # Queued prompts belong to the parent's callers; the parent's lock
+        # may have been held by one of its threads at fork time
+        self._queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, prompt: str) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatchScheduler is closed")
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._start()
+        future = Future()
+        self._queue.put((prompt, future))
+        return future
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """Blocking submit(): wait for this prompt's batch and return its output"""
+        return self.submit(prompt).result(timeout)
+
+    def close(self):
+        self._closed = True
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect_batch(self) -> List[Tuple[str, Future]]:
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Close requested: finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                return
+            prompts = [prompt for prompt, _ in batch]
+            try:
+                outputs = self._generate_batch(prompts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches_run += 1
+            self.prompts_run += len(batch)
+            for (_, future), output in zip(batch, outputs):
+                future.set_result(output)
+
+    def _generate_batch(self, prompts: List[str]) -> List[str]:
+        import torch
+
+        inputs = self.tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.max_input_tokens,
+        )
+        with torch.inference_mode():
+            output_ids = self.model.generate(
+                input_ids=inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                max_new_tokens=self.max_new_tokens,
+                do_sample=False,
+            )
+        return [
+            text.strip()
+            for text in self.tokenizer.batch_decode(
+                output_ids, skip_special_tokens=True
+            )
+        ]
+
+
+class Seq2SeqGenerator:
+    name = "seq2seq"
+
+    QUESTION_PROMPT = (
+        "Generate a factual question about this text that can be answered "
+        "with information directly from the text. Text: {context}"
+    )
+    ANSWER_PROMPT = "Answer this question based on the text: {question} Text: {context}"
+
+    def __init__(self, scheduler: MicroBatchScheduler, max_context_chars: int = 800):
+        self.scheduler = scheduler
+        self.max_context_chars = max_context_chars
+
+    def generate(
+        self, analysis, candidate: Optional[Candidate] = None
+    ) -> Optional[Tuple[str, str]]:
+        # Prompt with the indexed sentence so each candidate yields its own question
+        if candidate is not None:
+            context = candidate.sentence.text.strip()
+        else:
+            context = analysis.text
+        context = context[: self.max_context_chars]
+
+        question = self.scheduler.generate(self.QUESTION_PROMPT.format(context=context))
+        if not question:
+            return None
+        answer = self.scheduler.generate(
+            self.ANSWER_PROMPT.format(question=question, context=context)
+        )
+        if not answer:
+            return None
+        return question, answer.strip(" .")
+
+
+def load_seq2seq_scheduler(
+    model_path: str,
+    quantize: bool = True,
+    max_batch_size: int = 16,
+    max_wait_ms: float = 10,
+    max_new_tokens: int = 48,
+) -> MicroBatchScheduler:
+    """
+    Load a seq2seq model from a local path (no network access) for CPU
+    inference, optionally with int8 dynamic quantization of its Linear layers.
+    """
+    try:
+        import torch
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+    except ImportError:
+        raise Exception(
+            "QG_BACKEND=seq2seq needs the optional ML stack: "
+            "pip install -r requirements-ml.txt"
+        )
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_path, local_files_only=True)
+    model.eval()
+    if quantize:
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    return MicroBatchScheduler(
+        model,
+        tokenizer,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        max_new_tokens=max_new_tokens,
+    )
+
+
+_shared_scheduler: Optional[MicroBatchScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """Give a forked child its own locks and batching threads"""
+    global _shared_scheduler_lock
+    _shared_scheduler_lock = threading.Lock()
+    for scheduler in list(_schedulers):
+        scheduler._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_shared_scheduler() -> MicroBatchScheduler:
+    """One model and scheduler per process, shared by every NLPService in it"""
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            if not settings.qg_model_path:
+                raise Exception("QG_BACKEND=seq2seq requires QG_MODEL_PATH")
+            _shared_scheduler = load_seq2seq_scheduler(
+                settings.qg_model_path,
+                quantize=settings.qg_quantize,
+                max_batch_size=settings.qg_max_batch_size,
+                max_wait_ms=settings.qg_max_wait_ms,
+                max_new_tokens=settings.qg_max_new_tokens,
+            )
+        return _shared_scheduler
+
+
+def build_question_generator(backend: Optional[str] = None):
+    backend = backend or settings.qg_backend
+    if backend == RuleBasedGenerator.name:
+        return RuleBasedGenerator()
+    if backend == Seq2SeqGenerator.name:
+        return Seq2SeqGenerator(get_shared_scheduler())
+    raise ValueError(f"Unknown question generation backend: {backend}")
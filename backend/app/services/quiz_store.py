@@ -0,0 +1,142 @@
+import base64
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models.question import Question
+from ..models.quiz import Quiz
+from .dedup import index_questions
+
+logger = logging.getLogger(__name__)
+
+# Optional question fields and the values a question without them gets. Every
+# row is given all of them: rows with different keys can't share one INSERT
+QUESTION_DEFAULTS = {
+    "options": None,
+    "source_page": None,
+    "source_context_snippet": None,
+    "difficulty_level": Question.difficulty_level.default.arg,
+}
+
+
+def add_generated_quiz(
+    db: Session,
+    user_id: int,
+    title: str,
+    description: str,
+    questions_data: List[Dict],
+) -> Quiz:
+    """
+    Insert a generated quiz and its questions into db's transaction, without
+    committing: the quiz row, all questions as one batched INSERT ...
+    RETURNING (executemany) and their near-duplicate index rows. The
+    returned quiz has its questions loaded.
+    """
+    quiz = db.scalars(
+        insert(Quiz).returning(Quiz),
+        [
+            {
+                "title": title,
+                "description": description,
+                "user_id": user_id,
+                "total_questions": len(questions_data),
+            }
+        ],
+    ).one()
+
+    logger.debug("Created quiz %s", quiz.id)
+
+    questions = []
+    if questions_data:
+        # Unsorted RETURNING: with sort_by_parameter_order SQLite falls back to
+        # a statement per row. Every returned row is its own question, and
+        # ids follow insertion order, so sorting by id restores the order
+        questions = sorted(
+            db.scalars(
+                insert(Question).returning(Question),
+                [
+                    {**QUESTION_DEFAULTS, **question_data, "quiz_id": quiz.id}
+                    for question_data in questions_data
+                ],
+            ).all(),
+            key=lambda question: question.id,
+        )
+        # Index them for near-duplicate lookups
+        index_questions(db, user_id, questions)
+
+    # The questions were inserted without the relationship; attach them so
+    # reading quiz.questions doesn't query again
+    set_committed_value(quiz, "questions", questions)
+    return quiz
+
+
+def save_generated_quiz(
+    db: Session,
+    user_id: int,
+    title: str,
+    description: str,
+    questions_data: List[Dict],
+) -> Quiz:
+    """
+    Persist a generated quiz and its questions in one transaction with a
+    single commit, once generation has succeeded (the generate routes; job
+    workers commit add_generated_quiz() with the job instead). A failure
+    leaves nothing behind.
+    """
+    quiz = add_generated_quiz(db, user_id, title, description, questions_data)
+    db.commit()
+    return quiz
+
+
+def encode_quiz_cursor(quiz: Quiz) -> str:
+    """Opaque cursor for the listing position just after quiz"""
+    raw = f"{quiz.created_at.isoformat()}|{quiz.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_quiz_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(created_at, id) from a cursor; ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, quiz_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(quiz_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+async def list_user_quizzes(
+    db: AsyncSession, user_id: int, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Quiz], Optional[str]]:
+    """
+    One page of a user's quizzes, newest first, and the cursor of the next
+    page (None on the last one).
+
+    Keyset pagination on (created_at, id): each page is an index range scan
+    on ix_quizzes_user_id_created_at that starts where the previous page
+    ended, so page 100 costs the same as page 1, unlike OFFSET.
+    """
+    query = select(Quiz).where(Quiz.user_id == user_id)
+    if cursor:
+        created_at, quiz_id = decode_quiz_cursor(cursor)
+        query = query.where(
+            or_(
+                Quiz.created_at < created_at,
+                and_(Quiz.created_at == created_at, Quiz.id < quiz_id),
+            )
+        )
+
+    # One extra row tells whether there is a next page
+    quizzes = (
+        await db.scalars(
+            query.order_by(Quiz.created_at.desc(), Quiz.id.desc()).limit(limit + 1)
+        )
+    ).all()
+    if len(quizzes) > limit:
+        quizzes = quizzes[:limit]
+        return quizzes, encode_quiz_cursor(quizzes[-1])
+    return quizzes, None
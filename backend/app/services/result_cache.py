@@ -0,0 +1,97 @@
+"""
+Memoized results of seeded quiz generation.
+
+With a seed in the QuestionGenConfig, generation is deterministic, so the
+questions for a given (document content, config, seed) can be stored once
+and handed back to every identical request without running the NLP
+pipeline. Unseeded requests are random by design and never cached; neither
+are requests with avoid_bank_duplicates, whose output depends on the user's
+bank at the time.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.generation_result import GenerationResult
+
+# Bump whenever a code change alters the questions produced for the same
+# seed, so stale results stop matching
+GENERATOR_VERSION = "2"
+
+
+def content_digest(content: Union[str, bytes, bytearray]) -> str:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def generation_cache_key(digest: str, config: Dict) -> Optional[str]:
+    """Cache key for a generation request, or None if it must not be cached"""
+    if config.get("seed") is None or config.get("avoid_bank_duplicates"):
+        return None
+    payload = json.dumps(
+        {
+            "version": GENERATOR_VERSION,
+            # The same seed gives different questions from a different backend
+            "backend": settings.qg_backend,
+            "content": digest,
+            "config": config,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _expiry_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(days=settings.generation_result_ttl_days)
+
+
+def get_cached_questions(db: Session, key: str) -> Optional[List[Dict]]:
+    result = (
+        db.query(GenerationResult)
+        .filter(
+            GenerationResult.key == key,
+            GenerationResult.created_at >= _expiry_cutoff(),
+        )
+        .first()
+    )
+    return result.questions if result else None
+
+
+def store_questions(db: Session, key: str, questions: List[Dict]):
+    """
+    Remember questions under key; expired results are dropped on the way.
+
+    A run the memory ceiling cut short (GeneratedQuestions.truncated) is not
+    stored: it only covers part of the document, and how much depends on
+    memory use at the time, not on the key.
+    """
+    if getattr(questions, "truncated", False):
+        return
+    db.query(GenerationResult).filter(
+        GenerationResult.created_at < _expiry_cutoff()
+    ).delete(synchronize_session=False)
+    # An expired row with the same key would still hold the primary key
+    db.query(GenerationResult).filter(GenerationResult.key == key).delete(
+        synchronize_session=False
+    )
+    db.add(GenerationResult(key=key, questions=questions))
+    try:
+        db.commit()
+    except IntegrityError:
+        # An identical concurrent request stored the same result first
+        db.rollback()
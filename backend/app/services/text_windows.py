@@ -0,0 +1,73 @@
+"""
+Token-budgeted windows over text too long to parse as one spaCy Doc.
+
+A dense page (tables, an appendix) or a pasted document without blank lines
+arrives as a single chunk; parsed whole it can exceed nlp.max_length, and
+spaCy's memory grows with Doc length. These helpers cut such text into
+windows of whole sentences, each within a token budget, lazily, so the
+caller can parse and release one window before building the next.
+
+Sentences and tokens are found with regexes, not spaCy: the point is to
+avoid building the big Doc in the first place. The token estimate
+(words and punctuation marks) is close to spaCy's tokenizer for prose.
+"""
+
+import re
+from typing import Iterator
+
+# Ends at .!? (and any closing quote or bracket) only before whitespace or
+# the end of the text, so "3.14" or "e.g.," stay inside their sentence
+_SENTENCE = re.compile(r"\S.*?(?:[.!?]+[\"')\]\u201d]*(?=\s|\Z)|\Z)", re.DOTALL)
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    return sum(1 for _ in _TOKEN.finditer(text))
+
+
+def is_oversized(text: str, max_tokens: int) -> bool:
+    # Every token is at least one character, so short text needs no counting
+    return len(text) > max_tokens and estimate_tokens(text) > max_tokens
+
+
+def iter_sentences(text: str, max_tokens: int) -> Iterator[str]:
+    """
+    Sentences of text; a "sentence" over max_tokens (no end punctuation, as in
+    tables and lists) is cut between words into pieces that fit
+    """
+    for match in _SENTENCE.finditer(text):
+        sentence = match.group().strip()
+        if not sentence:
+            continue
+        if not is_oversized(sentence, max_tokens):
+            yield sentence
+            continue
+
+        piece = []
+        piece_tokens = 0
+        for word in sentence.split():
+            tokens = estimate_tokens(word)
+            if piece and piece_tokens + tokens > max_tokens:
+                yield " ".join(piece)
+                piece = []
+                piece_tokens = 0
+            piece.append(word)
+            piece_tokens += tokens
+        if piece:
+            yield " ".join(piece)
+
+
+def iter_sentence_windows(text: str, max_tokens: int) -> Iterator[str]:
+    """Consecutive sentences of text packed into windows of at most max_tokens"""
+    window = []
+    window_tokens = 0
+    for sentence in iter_sentences(text, max_tokens):
+        tokens = estimate_tokens(sentence)
+        if window and window_tokens + tokens > max_tokens:
+            yield " ".join(window)
+            window = []
+            window_tokens = 0
+        window.append(sentence)
+        window_tokens += tokens
+    if window:
+        yield " ".join(window)
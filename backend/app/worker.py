@@ -0,0 +1,58 @@
+"""
+Standalone quiz-generation worker.
+
+    python -m app.worker --concurrency 2
+
+Each worker thread claims jobs queued through POST /quiz/jobs, runs them with
+its own NLPService and stores the resulting quiz. Any number of worker
+processes can share one database; a crashed worker's job is reclaimed once
+its lease (JOB_LEASE_SECONDS) runs out.
+"""
+
+import argparse
+import logging
+import signal
+import threading
+
+from .core.config import settings
+from .core.database import Base, engine
+from .services.job_queue import JobQueue, JobWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run QuEstAI generation workers")
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Worker threads in this process"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    Base.metadata.create_all(bind=engine)
+
+    queue = JobQueue(lease_seconds=settings.job_lease_seconds)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    threads = [
+        threading.Thread(
+            target=JobWorker(
+                queue, poll_interval=settings.job_poll_interval_seconds
+            ).run_forever,
+            args=(stop_event,),
+            name=f"job-worker-{i}",
+        )
+        for i in range(max(1, args.concurrency))
+    ]
+    for thread in threads:
+        thread.start()
+    # Wait with a timeout so signals are delivered to the main thread
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=1)
+
+
+if __name__ == "__main__":
+    main()
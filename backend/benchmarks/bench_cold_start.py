@@ -0,0 +1,78 @@
+"""
+Measure API cold start against a time budget.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_cold_start --rounds 3 --import-budget 2 --ready-budget 20
+
+Phases, each in a fresh interpreter so nothing is already imported:
+- import: `import app.main`
+- startup: running the startup hooks (table creation, warm-up thread start)
+- ready: until GET /ready returns 200 (models loaded and warmed up)
+
+Exits non-zero if the best round of a phase is over its budget, so it can
+gate a deploy.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app.main
+from fastapi.testclient import TestClient
+imported = time.perf_counter()
+with TestClient(app.main.app) as client:
+    started = time.perf_counter()
+    while client.get("/ready").status_code != 200:
+        if time.perf_counter() - started > 300:
+            raise SystemExit("never became ready: " + client.get("/ready").text)
+        time.sleep(0.05)
+    ready = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "startup": started - imported,
+    "ready": ready - start,
+}))
+"""
+
+
+def measure_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+    )
+    # The app prints its own logs; the timings are the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--import-budget", type=float, default=2.0)
+    parser.add_argument("--ready-budget", type=float, default=20.0)
+    args = parser.parse_args()
+
+    rounds = [measure_once() for _ in range(args.rounds)]
+    budgets = {"import": args.import_budget, "ready": args.ready_budget}
+
+    over_budget = False
+    print(f"{'phase':<10}{'best s':>10}{'worst s':>10}{'budget s':>10}")
+    for phase in ("import", "startup", "ready"):
+        times = [r[phase] for r in rounds]
+        budget = budgets.get(phase)
+        print(
+            f"{phase:<10}{min(times):>10.3f}{max(times):>10.3f}"
+            f"{budget if budget is not None else '-':>10}"
+        )
+        if budget is not None and min(times) > budget:
+            over_budget = True
+
+    if over_budget:
+        print("Cold start is over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Check that quiz submission runs a constant number of SQL statements.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_grading --sizes 10,100,500
+
+Creates quizzes of each size in a throwaway SQLite database, submits a full
+set of answers to POST /quiz/{id}/submit and counts the statements the
+request executes (authentication, quiz + questions load, result update).
+Exits non-zero if the count changes with quiz size, i.e. an N+1 query crept
+back into grading.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,500", help="questions per quiz")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    workdir = tempfile.mkdtemp(prefix="questai-grading-")
+    # Before the app is imported, so it binds to the throwaway database
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/grading.db"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app.core.database import SessionLocal, async_engine
+    from app.main import app
+    from app.models import User
+    from app.services.quiz_store import save_generated_quiz
+
+    statements = []
+    event.listen(
+        async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *rest: statements.append(statement),
+    )
+
+    counts = {}
+    with TestClient(app) as client:
+        client.post(
+            "/auth/register",
+            json={
+                "username": "grader",
+                "email": "grader@example.com",
+                "password": "benchmark",
+            },
+        )
+        token = client.post(
+            "/auth/login", data={"username": "grader", "password": "benchmark"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        with SessionLocal() as db:
+            user_id = db.query(User.id).filter(User.username == "grader").scalar()
+            quizzes = {}
+            for size in sizes:
+                quiz = save_generated_quiz(
+                    db,
+                    user_id,
+                    f"Grading {size}",
+                    "",
+                    [
+                        {
+                            "question_text": f"Question {i} of {size}?",
+                            "question_type": "Short Answer",
+                            "options": None,
+                            "correct_answer": f"answer {i}",
+                            "bloom_level": "Remember",
+                            "source_page": 1,
+                            "source_context_snippet": "...",
+                        }
+                        for i in range(size)
+                    ],
+                )
+                quizzes[size] = (quiz.id, [question.id for question in quiz.questions])
+
+        print(f"{'questions':>10}{'statements':>12}{'ms':>10}")
+        for size, (quiz_id, question_ids) in quizzes.items():
+            answers = [
+                # Every other answer right, with case/whitespace noise
+                {
+                    "question_id": question_id,
+                    "user_answer": f"  ANSWER {i} " if i % 2 else "wrong",
+                }
+                for i, question_id in enumerate(question_ids)
+            ]
+            statements.clear()
+            start = time.perf_counter()
+            response = client.post(
+                f"/quiz/{quiz_id}/submit", json={"answers": answers}, headers=headers
+            )
+            elapsed = time.perf_counter() - start
+            response.raise_for_status()
+            assert response.json()["correct_answers"] == size // 2
+
+            counts[size] = len(statements)
+            print(f"{size:>10}{len(statements):>12}{elapsed * 1000:>10.1f}")
+
+    if len(set(counts.values())) > 1:
+        print("Statement count grows with quiz size: grading has an N+1 query")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
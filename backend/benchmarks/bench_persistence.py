@@ -0,0 +1,105 @@
+"""
+Check that saving a generated quiz is one transaction of batched statements.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_persistence --sizes 10,200,1000
+
+Saves quizzes of each size with save_generated_quiz() in a throwaway SQLite
+database and reports the statements and commits it took, and the time.
+Then makes the insert of the questions fail and checks that no quiz row was
+left behind. Exits non-zero if the statement count grows with quiz size
+beyond the executemany batches (insertmanyvalues, 1000 rows by default), if
+a save commits more than once, or if a failed save wrote anything.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def _questions(count: int):
+    return [
+        {
+            "question_text": f"Which statement about topic {i} is correct?",
+            "question_type": "MCQ",
+            "options": [f"Option {j} for {i}" for j in range(4)],
+            "correct_answer": f"Option 0 for {i}",
+            "bloom_level": "Remember",
+            "source_page": i + 1,
+            "source_context_snippet": f"Topic {i} is described on this page.",
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,200,1000", help="questions per quiz")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    workdir = tempfile.mkdtemp(prefix="questai-persistence-")
+    # Before the app is imported, so it binds to the throwaway database
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/persistence.db"
+
+    from sqlalchemy import event, func, select
+
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import Quiz, User
+    from app.services.quiz_store import save_generated_quiz
+
+    Base.metadata.create_all(bind=engine)
+    statements = []
+    commits = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *rest: statements.append(statement),
+    )
+    event.listen(SessionLocal, "after_commit", lambda session: commits.append(1))
+
+    ok = True
+    with SessionLocal() as db:
+        user = User(username="saver", email="saver@example.com", hashed_password="")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+        print(f"{'questions':>10}{'statements':>12}{'commits':>9}{'ms':>10}")
+        for size in sizes:
+            statements.clear()
+            commits.clear()
+            start = time.perf_counter()
+            quiz = save_generated_quiz(
+                db, user_id, f"Quiz {size}", "", _questions(size)
+            )
+            elapsed = time.perf_counter() - start
+            counted = len(statements)
+
+            # Quiz + index rows are fixed; questions are one statement per batch
+            allowed = 4 + (size - 1) // 1000
+            ok = ok and counted <= allowed and len(commits) == 1
+            print(f"{size:>10}{counted:>12}{len(commits):>9}{elapsed * 1000:>10.1f}")
+            # After counting: the commit expired quiz, this reloads it
+            assert len(quiz.questions) == quiz.total_questions == size
+
+        quizzes_before = db.scalar(select(func.count(Quiz.id)))
+        broken = _questions(3)
+        broken[2]["question_type"] = None  # NOT NULL column
+        try:
+            save_generated_quiz(db, user_id, "Broken", "", broken)
+        except Exception:
+            db.rollback()
+        left_behind = db.scalar(select(func.count(Quiz.id))) - quizzes_before
+        print(f"quizzes left by a failed save: {left_behind}")
+        ok = ok and left_behind == 0
+
+    if not ok:
+        print("Saving a quiz is no longer a single batched transaction")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
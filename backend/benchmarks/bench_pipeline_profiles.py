@@ -0,0 +1,76 @@
+"""
+Compare spaCy parsing throughput for each NLPService pipeline profile.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_pipeline_profiles --paragraphs 500 --rounds 3
+
+The parse cache is bypassed so every round measures real parsing work.
+"""
+
+import argparse
+import random
+import time
+
+from app.services.nlp_service import (
+    PROFILE_FULL,
+    PROFILE_NER,
+    PROFILE_SENTENCES,
+    NLPService,
+)
+
+SENTENCES = [
+    "Photosynthesis is the process by which green plants make food using sunlight.",
+    "The Mughal emperor Akbar ruled from Agra between 1556 and 1605.",
+    "Water boils at 100 degrees Celsius at sea level.",
+    "Mahatma Gandhi led the Salt March to Dandi in March 1930.",
+    "The mitochondria is the powerhouse of the cell.",
+    "India adopted its Constitution on 26 January 1950.",
+    "Newton described the law of universal gravitation in 1687.",
+    "The Ganga river flows through Uttar Pradesh, Bihar and West Bengal.",
+]
+
+
+def make_paragraphs(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 6)))
+        for _ in range(count)
+    ]
+
+
+def time_profile(service: NLPService, profile: str, paragraphs, rounds: int) -> float:
+    pipeline, disabled = service._pipeline_for(profile)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in pipeline.pipe(paragraphs, disable=disabled, batch_size=64):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paragraphs", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    service = NLPService()
+    paragraphs = make_paragraphs(args.paragraphs)
+
+    results = {
+        profile: time_profile(service, profile, paragraphs, args.rounds)
+        for profile in (PROFILE_FULL, PROFILE_NER, PROFILE_SENTENCES)
+    }
+
+    baseline = results[PROFILE_FULL]
+    print(f"{'profile':<12}{'seconds':>10}{'paras/s':>12}{'speedup':>10}")
+    for profile, seconds in results.items():
+        print(
+            f"{profile:<12}{seconds:>10.3f}{len(paragraphs) / seconds:>12.1f}"
+            f"{baseline / seconds:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Reproducible benchmarks for the generation and export pipelines.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_suite --sizes 10,100,500 --output benchmarks/results/HEAD.json
+    python -m benchmarks.bench_suite --compare benchmarks/results/base.json benchmarks/results/HEAD.json
+
+Everything runs locally against synthetic textbook PDFs (see
+synthetic_pdf.py; same seed, same files) and a throwaway SQLite database:
+
+- extraction: extract_text_from_pdf() pages/s per document size
+- analysis: iter_document_analysis() pages/s (spaCy, parse cache off)
+- generators: questions/s for each question generator, generator calls
+  only, drawing candidates from the analyzed document
+- api: /quiz/generate latency percentiles on the smallest document
+  (unseeded, so the result cache never answers)
+- export: ExportService.generate_exam_paper() time and peak RSS growth
+  for quizzes of several sizes
+
+Results are written as JSON with the commit they were measured at.
+--compare prints the change of every metric between two result files
+and exits non-zero when any got worse by more than --tolerance percent
+("_per_s" metrics are better when higher, everything else when lower).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from .synthetic_pdf import make_textbook_pdf
+
+GENERATORS = {
+    "mcq": "generate_mcq_question",
+    "short_answer": "generate_short_answer_question",
+    "true_false": "generate_true_false_question",
+}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset VmHWM so it tracks the peak from now on (Linux 4.0+)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def bench_extraction(service, pdfs: Dict[int, str], rounds: int) -> Dict:
+    results = {}
+    for pages, path in pdfs.items():
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            extracted = service.extract_text_from_pdf(path)
+            best = min(best, time.perf_counter() - start)
+        results[f"{pages}_pages"] = {
+            "seconds": best,
+            "pages_per_s": len(extracted) / best,
+        }
+    return results
+
+
+def bench_analysis_and_generators(
+    service, pdfs: Dict[int, str], questions: int
+) -> Dict:
+    from app.services.candidate_index import CandidateIndex
+    from app.services.entity_inventory import EntityInventory
+
+    analysis = {}
+    generators = {}
+    for pages, path in pdfs.items():
+        page_list = service.extract_text_from_pdf(path)
+        start = time.perf_counter()
+        chunks = list(service.iter_document_analysis(page_list))
+        seconds = time.perf_counter() - start
+        analysis[f"{pages}_pages"] = {
+            "seconds": seconds,
+            "pages_per_s": len(page_list) / seconds,
+        }
+
+        inventory = EntityInventory()
+        for chunk in chunks:
+            inventory.add_chunk(chunk["analysis"], chunk["page_number"])
+
+        for name, method in GENERATORS.items():
+            generate = getattr(service, method)
+            rng = random.Random(0)
+            index = CandidateIndex(max_per_kind=max(256, 2 * questions), rng=rng)
+            for chunk in chunks:
+                index.add_chunk(chunk["analysis"], chunk["page_number"])
+            extra = {"rng": rng} if name != "short_answer" else {}
+            if name == "mcq":
+                extra["inventory"] = inventory
+
+            produced = 0
+            elapsed = 0.0
+            kinds = service.GENERATOR_CANDIDATES[method]
+            while produced < questions:
+                candidate = index.take(kinds)
+                if candidate is None:
+                    break
+                start = time.perf_counter()
+                question = generate(
+                    candidate.analysis.text,
+                    candidate.page_number,
+                    candidate.analysis,
+                    candidate,
+                    **extra,
+                )
+                elapsed += time.perf_counter() - start
+                produced += question is not None
+
+            generators[f"{name}_{pages}_pages"] = {
+                "questions": produced,
+                "seconds": elapsed,
+                "questions_per_s": produced / elapsed if elapsed else 0.0,
+            }
+    return {"analysis": analysis, "generators": generators}
+
+
+def bench_api(pdf_path: str, requests: int, config: Dict) -> Dict:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    latencies = []
+    with TestClient(app) as client:
+        client.post(
+            "/auth/register",
+            json={
+                "username": "bench",
+                "email": "bench@example.com",
+                "password": "benchmark",
+            },
+        )
+        token = client.post(
+            "/auth/login", data={"username": "bench", "password": "benchmark"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        with open(pdf_path, "rb") as f:
+            pdf_bytes = f.read()
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = client.post(
+                "/quiz/generate",
+                data={"title": "Benchmark", "config": json.dumps(config)},
+                files={"file": ("bench.pdf", pdf_bytes, "application/pdf")},
+                headers=headers,
+            )
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    cut_points = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": requests,
+        "mean_seconds": statistics.fmean(latencies),
+        "p50_seconds": cut_points[49],
+        "p90_seconds": cut_points[89],
+        "p99_seconds": cut_points[98],
+    }
+
+
+def _make_quiz(question_count: int):
+    from app.models import Question, Quiz
+
+    rng = random.Random(question_count)
+    types = ["MCQ", "Short Answer", "True/False"]
+    questions = []
+    for i in range(question_count):
+        question_type = types[i % 3]
+        options = [f"Option {j} for question {i}" for j in range(4)]
+        questions.append(
+            Question(
+                question_text=f"Question {i}: what is described on page {i + 1}?",
+                question_type=question_type,
+                options=options if question_type == "MCQ" else None,
+                correct_answer=options[rng.randrange(4)],
+                bloom_level="Remember",
+                source_page=i + 1,
+                difficulty_level="Medium",
+            )
+        )
+    return Quiz(title="Benchmark", total_questions=question_count, questions=questions)
+
+
+def _export_in_fresh_process(question_count: int, rounds: int) -> Dict:
+    """Runs in a spawned interpreter, so RSS growth isn't hidden by reused heap"""
+    from app.services.export_service import ExportService
+
+    service = ExportService()
+    quiz = _make_quiz(question_count)
+    best = float("inf")
+    peak_growth = None
+    for round_number in range(rounds):
+        tracking = _reset_peak_rss()
+        baseline = _peak_rss()
+        start = time.perf_counter()
+        doc_io = service.generate_exam_paper(quiz)
+        best = min(best, time.perf_counter() - start)
+        # Later rounds reuse the first round's freed memory; only it shows growth
+        if round_number == 0 and tracking and baseline is not None:
+            peak_growth = _peak_rss() - baseline
+    return {
+        "seconds": best,
+        "peak_rss_growth_bytes": peak_growth,
+        "docx_bytes": len(doc_io.getvalue()),
+    }
+
+
+def bench_export(question_counts, rounds: int) -> Dict:
+    results = {}
+    for count in question_counts:
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results[f"{count}_questions"] = executor.submit(
+                _export_in_fresh_process, count, rounds
+            ).result()
+    return results
+
+
+def _flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(old_path: str, new_path: str, tolerance: float) -> bool:
+    """Print every metric's change; True if none regressed beyond tolerance %"""
+    with open(old_path) as f:
+        old = _flatten(json.load(f)["results"])
+    with open(new_path) as f:
+        new = _flatten(json.load(f)["results"])
+
+    ok = True
+    print(f"{'metric':<52}{'old':>12}{'new':>12}{'change':>10}")
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name], new[name]
+        if not before:
+            continue
+        change = (after - before) / before * 100
+        # Counts (questions produced, requests) are context, not performance
+        if name.endswith(("questions", "requests", "docx_bytes")):
+            flag = ""
+        else:
+            worse = -change if name.endswith("_per_s") else change
+            flag = "  REGRESSION" if worse > tolerance else ""
+            ok = ok and not flag
+        print(f"{name:<52}{before:>12.4g}{after:>12.4g}{change:>+9.1f}%{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", default="10,100,500", help="PDF page counts")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--questions", type=int, default=50, help="per generator")
+    parser.add_argument("--requests", type=int, default=20, help="API requests")
+    parser.add_argument("--export-sizes", default="50,200")
+    parser.add_argument("--seed", type=int, default=42, help="synthetic PDF seed")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--tolerance", type=float, default=10.0, help="percent")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(0 if compare(*args.compare, args.tolerance) else 1)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    workdir = tempfile.mkdtemp(prefix="questai-bench-")
+    # Before the app is imported: a throwaway database, no parse cache reuse
+    # across runs, and no caps that would cut the synthetic documents short
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["PARSE_CACHE_DIR"] = ""
+    os.environ["PARSE_CACHE_MAX_ENTRIES"] = "0"
+    os.environ.pop("PDF_MAX_PAGES", None)
+    os.environ.pop("PDF_MAX_CHARS", None)
+
+    from app.services.nlp_service import NLPService
+
+    pdfs = {
+        pages: make_textbook_pdf(
+            os.path.join(workdir, f"textbook-{pages}.pdf"), pages, args.seed
+        )
+        for pages in sizes
+    }
+
+    service = NLPService()
+    service.warm_up()
+    results = {"extraction": bench_extraction(service, pdfs, args.rounds)}
+    results.update(bench_analysis_and_generators(service, pdfs, args.questions))
+    results["api"] = bench_api(
+        pdfs[min(sizes)],
+        args.requests,
+        {"mcq_count": 5, "short_answer_count": 3, "true_false_count": 2},
+    )
+    results["export"] = bench_export(
+        [int(count) for count in args.export_sizes.split(",")], args.rounds
+    )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Per-process memory of a running gunicorn master and its workers.
+
+Usage (Linux):
+    python -m benchmarks.report_worker_memory <master pid>
+
+uss is memory private to one process; pss splits shared pages between the
+processes sharing them. With models preloaded in the master (see
+gunicorn.conf.py) each worker's uss should be a fraction of its rss.
+"""
+
+import argparse
+import sys
+
+from app.core.memory import process_memory
+
+
+def child_pids(pid: int):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pid", type=int, help="gunicorn master pid")
+    args = parser.parse_args()
+
+    processes = [("master", args.pid)] + [
+        ("worker", child) for child in child_pids(args.pid)
+    ]
+    mib = 1024 * 1024
+    totals = {"uss": 0, "pss": 0, "rss": 0}
+
+    print(f"{'role':<8}{'pid':>8}{'uss MiB':>10}{'pss MiB':>10}{'rss MiB':>10}")
+    for role, pid in processes:
+        usage = process_memory(pid)
+        if usage is None:
+            print(f"{role:<8}{pid:>8}  unavailable")
+            continue
+        for key in totals:
+            totals[key] += usage.get(key, 0)
+        print(
+            f"{role:<8}{pid:>8}{usage['uss'] / mib:>10.1f}"
+            f"{usage.get('pss', 0) / mib:>10.1f}{usage.get('rss', 0) / mib:>10.1f}"
+        )
+
+    if len(processes) == 1:
+        print("No workers found", file=sys.stderr)
+    print(
+        f"{'total':<8}{'':>8}{totals['uss'] / mib:>10.1f}"
+        f"{totals['pss'] / mib:>10.1f}{totals['rss'] / mib:>10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Synthetic textbook PDFs for the benchmarks, built locally with PyMuPDF.
+
+Pages look like the uploads we get: a chapter heading and a few paragraphs
+of definitions, dated events, people, places and numbers, separated by blank
+lines. Sentences are assembled from templates with a seeded RNG, so the same
+(pages, seed) always gives the same file, and there is enough variety that
+generation doesn't run out of distinct questions.
+"""
+
+import random
+
+import fitz  # PyMuPDF
+
+TOPICS = [
+    "Photosynthesis",
+    "Gravitation",
+    "The Mughal Empire",
+    "Cell Biology",
+    "The Indian Constitution",
+    "Electricity",
+    "Climate and Weather",
+    "The French Revolution",
+    "Chemical Reactions",
+    "Indian Rivers",
+]
+TERMS = [
+    "osmosis",
+    "a catalyst",
+    "the nucleus",
+    "inertia",
+    "a monsoon",
+    "an isotope",
+    "democracy",
+    "a tributary",
+    "friction",
+    "a glacier",
+    "an enzyme",
+    "refraction",
+]
+DEFINITIONS = [
+    "the movement of particles from one region to another",
+    "a substance that speeds up a reaction without being used up",
+    "the central part that controls the activities of the cell",
+    "the tendency of an object to resist a change in its motion",
+    "a seasonal wind that brings heavy rainfall",
+    "a form of an element with a different number of neutrons",
+    "a system of government elected by the people",
+    "a stream that flows into a larger river",
+]
+PEOPLE = [
+    "Akbar",
+    "Isaac Newton",
+    "Mahatma Gandhi",
+    "Marie Curie",
+    "Jawaharlal Nehru",
+    "Galileo Galilei",
+    "C. V. Raman",
+    "Ashoka",
+    "Rabindranath Tagore",
+    "Homi Bhabha",
+]
+PLACES = [
+    "Delhi",
+    "Agra",
+    "Kolkata",
+    "England",
+    "France",
+    "Bihar",
+    "Gujarat",
+    "Paris",
+    "Chennai",
+    "Punjab",
+]
+EVENTS = [
+    "founded a new school of thought",
+    "signed an important treaty",
+    "published a famous study",
+    "led a movement for reform",
+    "built a great monument",
+    "described a new law of nature",
+]
+
+TEMPLATES = [
+    "{Term} is {definition}.",
+    "{person} {event} in {place} in {year}.",
+    "In {year}, {person} travelled to {place} and {event}.",
+    "The experiment was repeated {count} times at a temperature of {count2} degrees.",
+    "{place} is home to about {count} million people according to the {year} census.",
+    "Students often confuse {term} with {other_term}.",
+    "The study of {topic_lower} was advanced by {person} in {place}.",
+    "There are {count} main stages in the process of {topic_lower}.",
+]
+
+
+def _sentence(rng: random.Random, topic: str) -> str:
+    term, other_term = rng.sample(TERMS, 2)
+    return rng.choice(TEMPLATES).format(
+        Term=term[0].upper() + term[1:],
+        term=term,
+        other_term=other_term,
+        definition=rng.choice(DEFINITIONS),
+        person=rng.choice(PEOPLE),
+        place=rng.choice(PLACES),
+        event=rng.choice(EVENTS),
+        year=rng.randint(1500, 2020),
+        count=rng.randint(2, 95),
+        count2=rng.randint(10, 400),
+        topic_lower=topic.lower(),
+    )
+
+
+def page_text(rng: random.Random, page_number: int) -> str:
+    topic = TOPICS[(page_number - 1) // 10 % len(TOPICS)]
+    paragraphs = [
+        " ".join(_sentence(rng, topic) for _ in range(rng.randint(4, 6)))
+        for _ in range(3)
+    ]
+    return f"Chapter {(page_number - 1) // 10 + 1}: {topic}\n\n" + "\n\n".join(
+        paragraphs
+    )
+
+
+def make_textbook_pdf(path: str, pages: int, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    doc = fitz.open()
+    try:
+        for page_number in range(1, pages + 1):
+            page = doc.new_page()  # A4
+            page.insert_textbox(
+                fitz.Rect(50, 50, page.rect.width - 50, page.rect.height - 50),
+                page_text(rng, page_number),
+                fontsize=10,
+            )
+        doc.save(path)
+    finally:
+        doc.close()
+    return path
@@ -0,0 +1,66 @@
+"""
+Multi-worker serving with the NLP models shared between workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The app and the generation pool's NLPService instances are loaded once in
+the master (preload_app + when_ready) and the workers are forked from it, so
+the model pages are shared copy-on-write instead of loaded once per worker.
+gc.freeze() moves everything loaded so far out of the collector's reach;
+otherwise the first collections in each worker would write to every
+object's header and un-share the pages.
+
+Only the "thread" GENERATION_EXECUTOR benefits: "process" mode spawns fresh
+interpreters that load their own models. Threads don't survive the fork, so
+with QG_BACKEND=seq2seq each worker starts its own micro-batching thread on
+its first prompt (the model itself stays shared).
+
+With PROMETHEUS_MULTIPROC_DIR set (an empty directory, cleared before each
+start) /metrics aggregates the samples of every worker; child_exit drops
+the live gauges of workers that have exited.
+
+Each worker logs its unique (private) memory once booted; compare it with
+the master's, or run benchmarks/report_worker_memory.py against the master
+pid while serving.
+"""
+
+import gc
+import os
+
+from app.core.memory import format_memory, process_memory
+
+bind = os.getenv("BIND", "0.0.0.0:7860")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = True
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before any worker is forked"""
+    from app.core.config import settings
+    from app.routers import quiz
+
+    if settings.generation_executor == "thread":
+        quiz.generation_pool.warm_up()
+        if quiz.generation_pool.warm_up_error:
+            server.log.warning(
+                "Models not preloaded: %s", quiz.generation_pool.warm_up_error
+            )
+    else:
+        server.log.info("Process executor: models are loaded per worker process")
+
+    gc.collect()
+    gc.freeze()
+    server.log.info("Master preloaded: %s", format_memory(process_memory()))
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    worker.log.info("Worker %s booted: %s", worker.pid, format_memory(process_memory()))
@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+# Before the app is imported: its engines bind to DATABASE_URL at import time
+_workdir = tempfile.mkdtemp(prefix="questai-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/test.db")
+os.environ.setdefault("PARSE_CACHE_DIR", "")
+os.environ.setdefault("NLP_WARMUP_ON_STARTUP", "false")
+os.environ.setdefault("JOB_UPLOAD_DIR", os.path.join(_workdir, "jobs"))
+
+import itertools  # noqa: E402
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import User  # noqa: E402
+
+_usernames = itertools.count()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The API, with its startup and shutdown hooks run once for the session"""
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def user(db):
+    """A new user, so tests never see each other's quizzes or question bank"""
+    name = f"user{next(_usernames)}"
+    user = User(username=name, email=f"{name}@example.com", hashed_password="")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _generated_questions(count):
+    """count generated questions, cycling MCQ, True/False and Short Answer"""
+    questions = []
+    for i in range(count):
+        if i % 3 == 0:
+            question = {
+                "question_type": "MCQ",
+                "options": [f"Option {j} for {i}" for j in range(4)],
+                "correct_answer": f"Option 0 for {i}",
+            }
+        elif i % 3 == 1:
+            question = {"question_type": "True/False", "correct_answer": "True"}
+        else:
+            question = {"question_type": "Short Answer", "correct_answer": f"topic {i}"}
+        question.update(
+            question_text=f"Which statement about topic {i} is correct?",
+            bloom_level="Remember",
+            source_page=i + 1,
+        )
+        questions.append(question)
+    return questions
+
+
+@pytest.fixture
+def make_questions():
+    """Factory for question dicts shaped like NLPService output"""
+    return _generated_questions
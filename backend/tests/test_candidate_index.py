@@ -0,0 +1,89 @@
+import random
+
+import pytest
+import spacy
+from spacy.tokens import Span
+
+from app.services.candidate_index import (
+    DEFINITION,
+    ENTITY,
+    NEGATABLE,
+    NUMERIC,
+    CandidateIndex,
+)
+from app.services.nlp_service import ChunkAnalysis
+
+ALL_KINDS = (DEFINITION, ENTITY, NUMERIC, NEGATABLE)
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    """Sentence boundaries only; tests mark entities by hand"""
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def _analysis(nlp, text, entities=()):
+    """ChunkAnalysis of text, with (entity text, label) pairs marked as entities"""
+    doc = nlp(text)
+    spans = []
+    for entity, label in entities:
+        start = text.index(entity)
+        spans.append(doc.char_span(start, start + len(entity), label=label))
+    doc.ents = [span for span in spans if isinstance(span, Span)]
+    return ChunkAnalysis(doc.text, doc)
+
+
+def test_take_hands_out_each_sentence_once(nlp):
+    index = CandidateIndex(rng=random.Random(0))
+    # Definition, numeric and negatable at once: listed under three categories
+    index.add_chunk(_analysis(nlp, "Water is a liquid that boils at 100 degrees."), 1)
+    index.add_chunk(
+        _analysis(
+            nlp,
+            "Gandhi led the Salt March in 1930. Osmosis is diffusion of water.",
+            [("Gandhi", "PERSON")],
+        ),
+        2,
+    )
+    assert index.remaining(ALL_KINDS) > 3
+
+    taken = []
+    while (candidate := index.take(ALL_KINDS)) is not None:
+        taken.append(candidate.key)
+
+    assert len(taken) == len(set(taken)) == 3
+    assert index.remaining(ALL_KINDS) == 0
+    assert index.take(ALL_KINDS) is None
+
+
+def test_take_only_draws_from_requested_kinds(nlp):
+    index = CandidateIndex(rng=random.Random(0))
+    index.add_chunk(
+        _analysis(
+            nlp,
+            "Newton wrote the Principia. Osmosis is diffusion of water.",
+            [("Newton", "PERSON")],
+        ),
+        1,
+    )
+    candidate = index.take([ENTITY])
+    assert (candidate.kind, candidate.entity.text) == (ENTITY, "Newton")
+    assert index.take([ENTITY]) is None
+    assert index.take([DEFINITION]).kind == DEFINITION
+
+
+def test_reservoir_stays_bounded_and_samples_whole_document(nlp):
+    index = CandidateIndex(max_per_kind=5, rng=random.Random(0))
+    for page in range(1, 201):
+        index.add_chunk(_analysis(nlp, f"Topic {page} is a short subject."), page)
+
+    assert index.sentences_indexed == 200
+    assert index.counts()[DEFINITION] == 5
+    pages = []
+    while (candidate := index.take([DEFINITION])) is not None:
+        pages.append(candidate.page_number)
+    assert len(pages) == 5
+    # A uniform sample, not just the first sentences seen
+    assert max(pages) > 5
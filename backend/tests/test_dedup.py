@@ -0,0 +1,139 @@
+from sqlalchemy import event, func, select
+
+from app.core.database import engine
+from app.models import Question, QuestionSignature, Quiz
+from app.services.dedup import (
+    DUPLICATE_THRESHOLD,
+    BankDuplicateFilter,
+    LSHIndex,
+    backfill_signatures,
+    default_hasher,
+)
+
+SUBJECTS = [
+    "photosynthesis",
+    "the French Revolution",
+    "Newton's second law",
+    "the Indian Constitution",
+    "osmosis in plant cells",
+    "the water cycle",
+    "the Mughal Empire",
+    "chemical bonding",
+    "the monsoon winds",
+    "electric current",
+]
+STEMS = [
+    "What is the main idea behind {}?",
+    "Which statement best describes {}?",
+    "Explain the role of {} in the chapter.",
+    "When was {} first described, and by whom?",
+    "Why is {} important for students to understand?",
+]
+
+
+def _questions():
+    return [stem.format(subject) for subject in SUBJECTS for stem in STEMS]
+
+
+def _variants(text: str):
+    """The question with one word dropped, and case, punctuation and spacing changed"""
+    words = text.rstrip("?.").split()
+    for i in range(1, len(words)):
+        yield "  ".join(words[:i] + words[i + 1 :]).upper() + " ?"
+
+
+def _jaccard(a: str, b: str) -> float:
+    a, b = default_hasher.shingles(a), default_hasher.shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def test_near_duplicates_are_found():
+    index = LSHIndex(default_hasher, DUPLICATE_THRESHOLD)
+    questions = _questions()
+    for key, text in enumerate(questions):
+        index.add(key, default_hasher.signature(text))
+
+    # Only variants clearly above the threshold: this measures LSH recall,
+    # not where the threshold falls
+    pairs = [
+        (key, variant)
+        for key, text in enumerate(questions)
+        for variant in _variants(text)
+        if _jaccard(text, variant) >= 0.85
+    ]
+    assert len(pairs) >= 20
+    found = sum(
+        key in index.query(default_hasher.signature(variant)) for key, variant in pairs
+    )
+    assert found / len(pairs) >= 0.9
+
+    reformatted = [f"  {text.upper()}!! " for text in questions]
+    assert all(
+        key in index.query(default_hasher.signature(text))
+        for key, text in enumerate(reformatted)
+    )
+
+
+def test_distinct_questions_are_kept():
+    index = LSHIndex(default_hasher, DUPLICATE_THRESHOLD)
+    questions = _questions()
+    assert all(index.add_if_new(key, text) for key, text in enumerate(questions))
+    assert len(index) == len(questions)
+    assert not index.add_if_new(len(questions), questions[0].lower())
+
+
+def _unindexed_quiz(db, user, texts):
+    """A quiz saved the way questions were before signatures existed"""
+    quiz = Quiz(title="Old quiz", user_id=user.id, total_questions=len(texts))
+    quiz.questions = [
+        Question(
+            question_text=text,
+            question_type="Short Answer",
+            correct_answer="answer",
+            bloom_level="Remember",
+        )
+        for text in texts
+    ]
+    db.add(quiz)
+    db.commit()
+    return quiz
+
+
+def test_backfill_makes_existing_questions_visible(db, user):
+    texts = _questions()[:5]
+    quiz = _unindexed_quiz(db, user, texts)
+    bank_filter = BankDuplicateFilter(user.id)
+    try:
+        assert not bank_filter(texts[0])
+
+        assert backfill_signatures(db, batch_size=2) >= len(texts)
+        assert db.scalar(
+            select(func.count(QuestionSignature.question_id)).where(
+                QuestionSignature.question_id.in_([q.id for q in quiz.questions])
+            )
+        ) == len(texts)
+        assert bank_filter(texts[0])
+        assert not bank_filter("How many moons does Jupiter have?")
+        # Nothing left to index the second time
+        assert backfill_signatures(db) == 0
+    finally:
+        bank_filter.close()
+
+
+def test_bank_filter_uses_one_connection_per_run(db, user):
+    texts = _questions()[:3]
+    _unindexed_quiz(db, user, texts)
+    backfill_signatures(db)
+
+    checkouts = []
+    listener = lambda *args: checkouts.append(1)  # noqa: E731
+    event.listen(engine, "checkout", listener)
+    bank_filter = BankDuplicateFilter(user.id)
+    try:
+        results = [bank_filter(text) for text in _questions()]
+    finally:
+        bank_filter.close()
+        event.remove(engine, "checkout", listener)
+
+    assert results[:3] == [True, True, True]
+    assert len(checkouts) == 1
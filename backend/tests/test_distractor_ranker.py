@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from app.services.distractor_ranker import DistractorRanker, normalize
+
+
+@pytest.fixture
+def ranker():
+    return DistractorRanker()
+
+
+@pytest.mark.parametrize(
+    "answer, variant",
+    [
+        ("Mahatma Gandhi", "Gandhi"),
+        ("Albert Einstein", "Einstein"),
+        ("Isaac Newton", "Newton's"),
+        ("1905", "1905."),
+        ("Newton", "Sir Isaac Newton"),
+        ("United States", "the United-States"),
+        ("Photosynthesis", "photosynth"),
+    ],
+)
+def test_other_forms_of_the_answer_are_never_offered(ranker, answer, variant):
+    candidates = [variant, "Jawaharlal Nehru", "Marie Curie", "1930", "Paris"]
+    ranked = ranker.rank(answer, candidates)
+    assert len(ranked) == 3
+    assert variant not in ranked
+
+
+def test_distractors_are_not_variants_of_each_other(ranker):
+    ranked = ranker.rank(
+        "Mahatma Gandhi",
+        ["Jawaharlal Nehru", "Nehru", "Sardar Patel", "Subhas Bose"],
+    )
+    assert sorted(ranked) == ["Jawaharlal Nehru", "Sardar Patel", "Subhas Bose"]
+
+
+def test_most_similar_candidates_come_first(ranker):
+    ranked = ranker.rank("1905", ["Paris", "1687", "1909"], k=2)
+    assert ranked[0] == "1909"
+
+
+def test_ties_keep_the_callers_order(ranker):
+    candidates = ["Apple", "Berry", "Cherry", "Damson"]
+    assert ranker.rank("Zzz", candidates, k=4) == candidates
+
+
+def test_rank_edge_cases(ranker):
+    assert ranker.rank("Gandhi", []) == []
+    assert ranker.rank("Gandhi", ["Nehru"], k=0) == []
+    assert ranker.rank("Gandhi", ["...", "Nehru"]) == ["Nehru"]
+
+
+def test_normalize_ignores_case_and_punctuation():
+    assert normalize("  Newton's  LAWS, (1687). ") == "newton laws 1687"
+    assert normalize("Jean-Paul Sartre") == "jean paul sartre"
+
+
+def test_embeddings_are_unit_rows(ranker):
+    matrix = ranker.embed(["Gandhi", "Nehru", ""])
+    assert matrix.shape == (3, ranker.dim)
+    assert np.allclose(np.linalg.norm(matrix[:2], axis=1), 1)
+    assert not matrix[2].any()
@@ -0,0 +1,42 @@
+from sqlalchemy import event
+
+from app.core.database import async_engine
+from app.core.security import create_access_token
+from app.services.quiz_store import save_generated_quiz
+
+
+def _submit(client, user, quiz):
+    """Submit every question's correct answer; the response and its statement count"""
+    answers = [
+        {"question_id": question.id, "user_answer": question.correct_answer}
+        for question in quiz.questions
+    ]
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+    statements = []
+
+    def listener(conn, cursor, statement, *rest):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        response = client.post(
+            f"/quiz/{quiz.id}/submit", json={"answers": answers}, headers=headers
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    return response, len(statements)
+
+
+def test_grading_statements_do_not_grow_with_quiz_size(
+    client, db, user, make_questions
+):
+    small = save_generated_quiz(db, user.id, "Small", "", make_questions(5))
+    large = save_generated_quiz(db, user.id, "Large", "", make_questions(50))
+
+    small_response, small_statements = _submit(client, user, small)
+    large_response, large_statements = _submit(client, user, large)
+
+    assert small_response.status_code == large_response.status_code == 200
+    assert small_response.json()["score"] == large_response.json()["score"] == 100
+    assert large_response.json()["correct_answers"] == 50
+    assert 0 < small_statements == large_statements
@@ -0,0 +1,233 @@
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.core.database import SessionLocal, engine
+from app.models import GenerationJob, Quiz
+from app.services.job_queue import (
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobQueue,
+    JobWorker,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(db):
+    """Every test starts with no jobs, so claim() only sees its own"""
+    db.query(GenerationJob).delete()
+    db.commit()
+
+
+def _enqueue(queue, db, user, **kwargs):
+    # Unique text, so no job is answered from another test's result cache
+    return queue.enqueue(
+        db, user.id, "Job", "", "text", {}, text_content=uuid.uuid4().hex, **kwargs
+    )
+
+
+def _job(job_id):
+    with SessionLocal() as db:
+        return db.get(GenerationJob, job_id)
+
+
+def _set(job_id, **values):
+    with SessionLocal() as db:
+        db.query(GenerationJob).filter(GenerationJob.id == job_id).update(values)
+        db.commit()
+
+
+def test_concurrent_claims_take_each_job_once(db, user):
+    queue = JobQueue()
+    job_ids = [_enqueue(queue, db, user).id for _ in range(12)]
+    claimed = []
+
+    def claim_all(worker_id):
+        while (job_id := queue.claim(worker_id)) is not None:
+            claimed.append((job_id, worker_id))
+
+    threads = [
+        threading.Thread(target=claim_all, args=(f"worker-{i}",)) for i in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(job_id for job_id, _ in claimed) == job_ids
+    for job_id, worker_id in claimed:
+        job = _job(job_id)
+        assert (job.status, job.locked_by, job.attempts) == (RUNNING, worker_id, 1)
+
+
+def test_claim_moves_on_when_another_worker_wins_the_race(db, user):
+    queue = JobQueue()
+    first, second = _enqueue(queue, db, user).id, _enqueue(queue, db, user).id
+    stolen = []
+
+    def steal_first(conn, cursor, statement, *rest):
+        # Between worker-a picking its candidate and updating it
+        if statement.startswith("UPDATE generation_jobs") and not stolen:
+            stolen.append(None)
+            stolen[0] = queue.claim("worker-b")
+
+    event.listen(engine, "before_cursor_execute", steal_first)
+    try:
+        claimed = queue.claim("worker-a")
+    finally:
+        event.remove(engine, "before_cursor_execute", steal_first)
+
+    assert stolen == [first]
+    assert claimed == second
+    assert _job(first).locked_by == "worker-b"
+    assert _job(second).locked_by == "worker-a"
+
+
+def test_reclaim_orphans_requeues_stale_leases(db, user):
+    queue = JobQueue(lease_seconds=60, retry_backoff_seconds=0)
+    stale, live = _enqueue(queue, db, user).id, _enqueue(queue, db, user).id
+    assert queue.claim("crashed") == stale
+    assert queue.claim("alive") == live
+    _set(stale, heartbeat_at=datetime.utcnow() - timedelta(seconds=61))
+
+    assert queue.reclaim_orphans() == 1
+    job = _job(stale)
+    assert (job.status, job.locked_by, job.attempts) == (QUEUED, None, 1)
+    assert "crashed" in job.error
+    assert _job(live).locked_by == "alive"
+    # The crashed worker finds out at its next heartbeat
+    assert not queue.heartbeat(stale, "crashed", 0.5)
+    assert queue.heartbeat(live, "alive", 0.5)
+
+
+def test_orphan_out_of_attempts_fails_and_drops_upload(db, user, tmp_path):
+    queue = JobQueue(lease_seconds=60)
+    upload = tmp_path / "upload.pdf"
+    upload.write_bytes(b"%PDF")
+    job_id = _enqueue(queue, db, user, source_path=str(upload)).id
+    _set(job_id, max_attempts=1)
+    queue.claim("crashed")
+    _set(job_id, heartbeat_at=datetime.utcnow() - timedelta(seconds=61))
+
+    queue.reclaim_orphans()
+    assert _job(job_id).status == FAILED
+    assert not upload.exists()
+
+
+def test_failures_retry_with_exponential_backoff(db, user):
+    queue = JobQueue(retry_backoff_seconds=10)
+    job_id = _enqueue(queue, db, user).id
+
+    for attempt, backoff in [(1, 10), (2, 20)]:
+        assert queue.claim("worker") == job_id
+        before = datetime.utcnow()
+        queue.fail(job_id, "worker", f"attempt {attempt} failed")
+        job = _job(job_id)
+        assert (job.status, job.attempts) == (QUEUED, attempt)
+        delay = (job.available_at - before).total_seconds()
+        assert backoff - 1 <= delay <= backoff + 1
+        # Not claimable until the backoff has passed
+        assert queue.claim("worker") is None
+        _set(job_id, available_at=datetime.utcnow())
+
+    assert queue.claim("worker") == job_id
+    queue.fail(job_id, "worker", "attempt 3 failed")
+    job = _job(job_id)
+    assert (job.status, job.attempts, job.error) == (FAILED, 3, "attempt 3 failed")
+
+
+def test_fail_from_a_worker_without_the_lease_is_ignored(db, user):
+    queue = JobQueue()
+    job_id = _enqueue(queue, db, user).id
+    queue.claim("owner")
+    queue.fail(job_id, "intruder", "not yours")
+    job = _job(job_id)
+    assert (job.status, job.locked_by, job.error) == (RUNNING, "owner", None)
+
+
+def _question():
+    return {
+        "question_text": "What is osmosis?",
+        "question_type": "Short Answer",
+        "correct_answer": "movement of water across a membrane",
+        "bloom_level": "Remember",
+        "source_page": 1,
+    }
+
+
+class _Service:
+    """Generates one question, running before() first"""
+
+    def __init__(self, before=None):
+        self.before = before
+
+    def generate_questions_from_text(self, text, config, on_progress, is_duplicate):
+        if self.before:
+            self.before()
+        on_progress(0.5)
+        return [_question()]
+
+
+def _quizzes(db, user):
+    return db.scalar(select(func.count(Quiz.id)).where(Quiz.user_id == user.id))
+
+
+def test_worker_saves_quiz_with_job(db, user):
+    queue = JobQueue()
+    job_id = _enqueue(queue, db, user).id
+    worker = JobWorker(queue, worker_id="worker", service_factory=_Service)
+
+    assert worker.run_once()
+    job = _job(job_id)
+    assert (job.status, job.locked_by, job.progress) == (SUCCEEDED, None, 1.0)
+    assert db.get(Quiz, job.quiz_id).user_id == user.id
+
+
+def test_worker_that_lost_its_lease_saves_nothing(db, user):
+    queue = JobQueue()
+    job_id = _enqueue(queue, db, user).id
+
+    def reclaimed_by_another_worker():
+        _set(job_id, locked_by="new-owner", attempts=2)
+
+    worker = JobWorker(
+        queue,
+        worker_id="old-owner",
+        service_factory=lambda: _Service(before=reclaimed_by_another_worker),
+    )
+    quizzes_before = _quizzes(db, user)
+
+    assert worker.run_once()
+    job = _job(job_id)
+    # Neither completed nor failed: the job belongs to the new owner now
+    assert (job.status, job.locked_by, job.attempts) == (RUNNING, "new-owner", 2)
+    assert job.quiz_id is None and job.error is None
+    assert _quizzes(db, user) == quizzes_before
+
+
+@pytest.mark.skipif(engine.dialect.name != "sqlite", reason="checks SQLite's schema")
+def test_deleting_a_job_quiz_keeps_the_job(db, user):
+    queue = JobQueue()
+    quiz = Quiz(title="From a job", user_id=user.id, total_questions=0)
+    db.add(quiz)
+    db.commit()
+    job_id = _enqueue(queue, db, user).id
+    _set(job_id, status=SUCCEEDED, quiz_id=quiz.id)
+
+    # The app's engine doesn't enforce foreign keys on SQLite; Postgres does
+    connection = sqlite3.connect(engine.url.database)
+    try:
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.execute("DELETE FROM quizzes WHERE id = ?", (quiz.id,))
+        connection.commit()
+    finally:
+        connection.close()
+
+    job = _job(job_id)
+    assert (job.status, job.quiz_id) == (SUCCEEDED, None)
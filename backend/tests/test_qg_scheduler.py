@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from app.services.qg_backends import MicroBatchScheduler  # noqa: E402
+
+WORDS = (
+    "generate a factual question about this text that can be answered with "
+    "information directly from the text photosynthesis osmosis is the process"
+).split()
+
+
+@pytest.fixture(scope="module")
+def tiny_t5():
+    """A randomly initialized two-layer T5 and a word-level tokenizer for it"""
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    vocab = {"<pad>": 0, "</s>": 1, "<unk>": 2}
+    for word in WORDS:
+        vocab.setdefault(word, len(vocab))
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = transformers.PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        pad_token="<pad>",
+        eos_token="</s>",
+        unk_token="<unk>",
+    )
+    torch.manual_seed(0)
+    config = transformers.T5Config(
+        vocab_size=len(vocab),
+        d_model=32,
+        d_ff=64,
+        num_layers=2,
+        num_heads=2,
+        d_kv=16,
+        decoder_start_token_id=0,
+        pad_token_id=0,
+        eos_token_id=1,
+    )
+    model = transformers.T5ForConditionalGeneration(config).eval()
+    return model, tokenizer
+
+
+class RecordingScheduler(MicroBatchScheduler):
+    """Records each batch's size and when it started; can hold or fail batches"""
+
+    def __init__(self, *args, fail_batches=0, **kwargs):
+        self.batches = []
+        self.fail_batches = fail_batches
+        self.hold = threading.Event()
+        self.hold.set()
+        super().__init__(*args, **kwargs)
+
+    def _generate_batch(self, prompts):
+        self.batches.append((time.monotonic(), len(prompts)))
+        self.hold.wait()
+        if self.fail_batches:
+            self.fail_batches -= 1
+            raise ValueError("generation failed")
+        return super()._generate_batch(prompts)
+
+
+def _prompts(count):
+    return [
+        f"generate a factual question about {WORDS[i % len(WORDS)]}"
+        for i in range(count)
+    ]
+
+
+def test_prompts_from_many_threads_share_batches(tiny_t5):
+    scheduler = RecordingScheduler(
+        *tiny_t5, max_batch_size=4, max_wait_ms=50, max_new_tokens=4
+    )
+    prompts = _prompts(40)
+    results = {}
+
+    def submit_all(offset):
+        for i in range(offset, len(prompts), 8):
+            results[i] = scheduler.generate(prompts[i], timeout=30)
+
+    threads = [threading.Thread(target=submit_all, args=(i,)) for i in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        scheduler.close()
+
+    assert sorted(results) == list(range(len(prompts)))
+    assert scheduler.prompts_run == len(prompts)
+    assert scheduler.batches_run < len(prompts)
+    assert max(size for _, size in scheduler.batches) <= 4
+    # Greedy decoding: batching doesn't change a prompt's output
+    alone = MicroBatchScheduler(*tiny_t5, max_batch_size=1, max_new_tokens=4)
+    try:
+        assert alone.generate(prompts[5], timeout=30) == results[5]
+    finally:
+        alone.close()
+
+
+def test_lone_prompt_waits_at_most_max_wait(tiny_t5):
+    scheduler = RecordingScheduler(
+        *tiny_t5, max_batch_size=16, max_wait_ms=100, max_new_tokens=4
+    )
+    try:
+        submitted = time.monotonic()
+        scheduler.generate(_prompts(1)[0], timeout=30)
+    finally:
+        scheduler.close()
+
+    [(started, size)] = scheduler.batches
+    assert size == 1
+    assert 0.09 <= started - submitted < 0.5
+
+
+def test_close_resolves_queued_prompts(tiny_t5):
+    scheduler = RecordingScheduler(*tiny_t5, max_batch_size=2, max_new_tokens=4)
+    scheduler.hold.clear()
+    futures = [scheduler.submit(prompt) for prompt in _prompts(7)]
+    # The first batch is running; the rest are queued behind it
+    closer = threading.Thread(target=scheduler.close)
+    closer.start()
+    scheduler.hold.set()
+    closer.join(timeout=30)
+
+    assert not closer.is_alive()
+    assert all(future.done() and future.exception() is None for future in futures)
+    assert scheduler.prompts_run == len(futures)
+    with pytest.raises(RuntimeError):
+        scheduler.submit("too late")
+
+
+def test_batch_failure_reaches_every_future(tiny_t5):
+    scheduler = RecordingScheduler(
+        *tiny_t5, max_batch_size=8, max_wait_ms=200, max_new_tokens=4, fail_batches=1
+    )
+    try:
+        futures = [scheduler.submit(prompt) for prompt in _prompts(5)]
+        errors = [future.exception(timeout=30) for future in futures]
+        # The scheduler keeps serving after a failed batch
+        assert isinstance(scheduler.generate(_prompts(1)[0], timeout=30), str)
+    finally:
+        scheduler.close()
+
+    assert [size for _, size in scheduler.batches][0] == 5
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert len({id(error) for error in errors}) == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_runs_its_own_batching_thread(tiny_t5):
+    scheduler = MicroBatchScheduler(*tiny_t5, max_new_tokens=4)
+    prompt = _prompts(1)[0]
+    try:
+        expected = scheduler.generate(prompt, timeout=30)
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Child, like a gunicorn worker forked from a preloading master
+            status = 1
+            try:
+                output = scheduler.generate(prompt, timeout=10)
+                os.write(write_end, output.encode())
+                status = 0
+            finally:
+                os._exit(status)
+        os.close(write_end)
+        with os.fdopen(read_end, "rb") as child_output:
+            output = child_output.read().decode()
+        _, status = os.waitpid(pid, 0)
+        # The parent's thread is unaffected
+        assert scheduler.generate(prompt, timeout=30) == expected
+    finally:
+        scheduler.close()
+
+    assert os.WEXITSTATUS(status) == 0
+    assert output == expected
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, async_engine, engine
+from app.core.security import create_access_token
+from app.routers import quiz as quiz_router
+from app.services.quiz_store import save_generated_quiz
+
+
+def _save(db, user, questions):
+    """Save a quiz; the quiz, its INSERT statements and the commits it took"""
+    inserts = []
+    commits = []
+
+    def on_execute(conn, cursor, statement, *rest):
+        if statement.lstrip().upper().startswith("INSERT"):
+            inserts.append(statement)
+
+    def on_commit(session):
+        commits.append(session)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(SessionLocal, "after_commit", on_commit)
+    try:
+        quiz = save_generated_quiz(db, user.id, "Saved", "", questions)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(SessionLocal, "after_commit", on_commit)
+    return quiz, len(inserts), len(commits)
+
+
+def test_save_is_one_commit_of_batched_inserts(db, user, make_questions):
+    _, small_inserts, small_commits = _save(db, user, make_questions(3))
+    _, large_inserts, large_commits = _save(db, user, make_questions(60))
+
+    assert small_commits == large_commits == 1
+    # Quiz, questions, and their signatures and bands for the question bank
+    assert small_inserts == large_inserts == 4
+
+
+def test_saved_questions_keep_generation_order(db, user, make_questions):
+    # Generated newest topic first, so order by text would not match
+    questions = make_questions(25)[::-1]
+    quiz, _, _ = _save(db, user, questions)
+
+    expected = [question["question_text"] for question in questions]
+    assert [question.question_text for question in quiz.questions] == expected
+    db.expire_all()
+    assert [question.question_text for question in quiz.questions] == expected
+
+
+def _list_all(client, user, limit):
+    """Every page of GET /quiz/, following X-Next-Cursor"""
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+    pages = []
+    params = {"limit": limit}
+    while True:
+        response = client.get("/quiz/", params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append([quiz["id"] for quiz in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+        params = {"limit": limit, "cursor": cursor}
+
+
+def test_listing_pages_through_quizzes_created_in_the_same_second(client, db, user):
+    quizzes = [save_generated_quiz(db, user.id, f"Quiz {i}", "", []) for i in range(8)]
+    # The newest keeps the server default timestamp; four are bound from
+    # Python within that same second, and the oldest three a second earlier
+    second = quizzes[-1].created_at.replace(microsecond=0)
+    for quiz in quizzes[3:7]:
+        quiz.created_at = second.replace(microsecond=654321)
+    for quiz in quizzes[:3]:
+        quiz.created_at = second - timedelta(seconds=1)
+    db.commit()
+
+    pages = _list_all(client, user, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 2]
+    newest_first = sorted(
+        quizzes, key=lambda quiz: (quiz.created_at.replace(microsecond=0), quiz.id)
+    )[::-1]
+    assert sum(pages, []) == [quiz.id for quiz in newest_first]
+
+
+def test_listing_rejects_a_malformed_cursor(client, user):
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+    response = client.get("/quiz/", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_generation_holds_no_database_connection(
+    client, user, monkeypatch, make_questions
+):
+    checked_out = []
+
+    async def run(method, *args):
+        checked_out.append(async_engine.sync_engine.pool.checkedout())
+        return make_questions(2)
+
+    monkeypatch.setattr(quiz_router.generation_pool, "run", run)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+    body = {"title": "Pooled", "text_content": "Some text. " * 20, "config": {}}
+    response = client.post("/quiz/generate/from-text", json=body, headers=headers)
+
+    assert response.status_code == 200
+    assert checked_out == [0]
+    assert len(response.json()["questions"]) == 2
@@ -0,0 +1,108 @@
+import itertools
+
+import pytest
+import spacy
+
+from app.core import memory
+from app.core.config import settings
+from app.schemas.question import QuestionGenConfig
+from app.services.nlp_service import GeneratedQuestions, NLPService
+from app.services.result_cache import (
+    content_digest,
+    generation_cache_key,
+    get_cached_questions,
+    store_questions,
+)
+
+requires_model = pytest.mark.skipif(
+    not spacy.util.is_package("en_core_web_sm"),
+    reason="spaCy model en_core_web_sm is not installed",
+)
+
+TEXT = """Photosynthesis is the process by which green plants make their own food
+using sunlight, water and carbon dioxide.
+
+In 1905, Albert Einstein published his theory of special relativity in Germany.
+Isaac Newton described the laws of motion in England in 1687.
+
+The Ganga river flows through Uttar Pradesh, Bihar and West Bengal. It is about
+2525 kilometres long and supports over 400 million people.
+
+Osmosis is the movement of water molecules across a semi-permeable membrane.
+Mahatma Gandhi led the Salt March from Sabarmati to Dandi in 1930."""
+
+CONFIG = QuestionGenConfig(
+    mcq_count=3, short_answer_count=2, true_false_count=2, seed=1234
+).dict()
+
+_usernames = itertools.count()
+
+
+def _auth_headers(client):
+    name = f"seeded{next(_usernames)}"
+    client.post(
+        "/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret1"},
+    )
+    token = client.post(
+        "/auth/login", data={"username": name, "password": "secret1"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _generated_fields(response_questions, generated):
+    """The response's questions cut down to the fields generation produces"""
+    return [
+        {key: question[key] for key in expected}
+        for question, expected in zip(response_questions, generated)
+    ]
+
+
+@requires_model
+def test_seed_gives_same_questions_with_and_without_cache_hit(client, db):
+    headers = _auth_headers(client)
+    key = generation_cache_key(content_digest(TEXT), CONFIG)
+    assert get_cached_questions(db, key) is None
+
+    body = {"title": "Seeded", "text_content": TEXT, "config": CONFIG}
+    generated = client.post("/quiz/generate/from-text", json=body, headers=headers)
+    assert generated.status_code == 200
+    assert get_cached_questions(db, key) is not None
+    cached = client.post("/quiz/generate/from-text", json=body, headers=headers)
+    assert cached.status_code == 200
+    uncached = NLPService().generate_questions_from_text(TEXT, CONFIG)
+
+    assert uncached
+    generated_questions = generated.json()["questions"]
+    assert _generated_fields(generated_questions, uncached) == list(uncached)
+    assert cached.json()["questions"] == [
+        dict(question, id=cached_question["id"], quiz_id=cached_question["quiz_id"])
+        for question, cached_question in zip(
+            generated_questions, cached.json()["questions"]
+        )
+    ]
+
+
+@requires_model
+def test_memory_ceiling_cut_marks_result_truncated(monkeypatch):
+    # The ceiling is checked between parse batches: make each batch 4 paragraphs
+    monkeypatch.setattr(settings, "nlp_batch_size", 1)
+    service = NLPService()
+    assert not service.generate_questions_from_text(TEXT, CONFIG).truncated
+
+    # Every rss reading is 1 GiB above the previous one
+    readings = itertools.count(0, 2**30)
+    monkeypatch.setattr(memory, "current_rss", lambda: next(readings))
+    monkeypatch.setattr(settings, "generation_memory_ceiling_mb", 1)
+    assert service.generate_questions_from_text(TEXT, CONFIG).truncated
+
+
+def test_truncated_result_is_not_memoized(db):
+    questions = GeneratedQuestions([{"question_text": "What is osmosis?"}])
+    questions.truncated = True
+    store_questions(db, "truncated-result", questions)
+    assert get_cached_questions(db, "truncated-result") is None
+
+    questions.truncated = False
+    store_questions(db, "complete-result", questions)
+    assert get_cached_questions(db, "complete-result") == list(questions)
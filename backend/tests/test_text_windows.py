@@ -0,0 +1,58 @@
+from app.services.text_windows import (
+    estimate_tokens,
+    is_oversized,
+    iter_sentence_windows,
+    iter_sentences,
+)
+
+
+def test_sentences_end_only_before_whitespace():
+    text = (
+        'Pi is 3.14 approx. It is irrational! Is it? He said "stop." Then (aside.) end'
+    )
+    assert list(iter_sentences(text, 100)) == [
+        "Pi is 3.14 approx.",
+        "It is irrational!",
+        "Is it?",
+        'He said "stop."',
+        "Then (aside.)",
+        "end",
+    ]
+
+
+def test_sentences_skip_blank_text():
+    assert list(iter_sentences("", 10)) == []
+    assert list(iter_sentences(" \n\n ", 10)) == []
+
+
+def test_sentence_over_budget_is_cut_between_words():
+    row = " ".join(f"cell{i}" for i in range(25))
+    pieces = list(iter_sentences(row, 10))
+    assert [len(piece.split()) for piece in pieces] == [10, 10, 5]
+    assert " ".join(pieces) == row
+
+
+def test_windows_pack_whole_sentences_within_budget():
+    sentences = [f"Sentence {i} has about 3.5 words." for i in range(40)]
+    text = " ".join(sentences)
+    windows = list(iter_sentence_windows(text, 50))
+
+    assert len(windows) > 1
+    assert all(estimate_tokens(window) <= 50 for window in windows)
+    # Nothing lost, nothing reordered, and no sentence split across windows
+    assert " ".join(windows) == text
+    assert all(window.endswith("words.") for window in windows)
+
+
+def test_windows_are_produced_lazily():
+    windows = iter_sentence_windows("First one. " * 10**5, 20)
+    assert estimate_tokens(next(windows)) <= 20
+
+
+def test_is_oversized():
+    assert not is_oversized("short text", 5)
+    assert not is_oversized("one two three four five", 5)
+    assert is_oversized("one two three four five six", 5)
+    # Long in characters but few tokens
+    assert not is_oversized("antidisestablishmentarianism", 5)
+    assert estimate_tokens("One, two.") == 4
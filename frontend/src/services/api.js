@@ -60,7 +60,21 @@ export const quizAPI = {
     });
   },
   
-  getUserQuizzes: () => api.get('/quiz/'),
+  // GET /quiz/ returns one page at a time: follow X-Next-Cursor to the last
+  // page, so callers (dashboard totals and averages) see every quiz
+  getUserQuizzes: async () => {
+    const quizzes = [];
+    let cursor = null;
+    let response;
+    do {
+      response = await api.get('/quiz/', {
+        params: cursor ? { limit: 200, cursor } : { limit: 200 },
+      });
+      quizzes.push(...response.data);
+      cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return { ...response, data: quizzes };
+  },
   
   getQuiz: (quizId) => api.get(`/quiz/${quizId}`),
   